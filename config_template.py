@@ -59,14 +59,12 @@ LLM_PROVIDER = "openai"
 # Automatic API Key Selection
 # LLM_API_KEY automatically points to the correct key based on LLM_PROVIDER
 # This makes it easier to switch providers without changing code
-if LLM_PROVIDER == "openai":
-    LLM_API_KEY = OPENAI_API_KEY
-elif LLM_PROVIDER == "gemini":
-    LLM_API_KEY = GEMINI_API_KEY
-elif LLM_PROVIDER == "ollama":
-    LLM_API_KEY = None  # Ollama doesn't require an API key
-else:
-    LLM_API_KEY = OPENAI_API_KEY  # Default to OpenAI
+_PROVIDER_KEYS = {
+    "openai": OPENAI_API_KEY,
+    "gemini": GEMINI_API_KEY,
+    "ollama": None,  # Ollama doesn't require an API key
+}
+LLM_API_KEY = _PROVIDER_KEYS.get(LLM_PROVIDER, OPENAI_API_KEY)  # Default to OpenAI
 
 # --- Module folder structure ---
 MODULES_DIR = "modules"
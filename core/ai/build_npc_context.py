@@ -5,11 +5,41 @@ Completely agnostic - extracts NPCs from the locations->npcs structure in area f
 """
 
 import os
-import json
-from pathlib import Path
-from typing import Dict, Set, List, Optional
+import sys
+import heapq
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Set, List, Optional, Tuple, FrozenSet
 from utils.encoding_utils import safe_json_load
 
+# Module directories that never contain adventure areas
+SYSTEM_DIRS = ("conversation_history", "campaign_archives", "campaign_summaries")
+
+# Area files whose names contain any of these are backups and never scanned
+BACKUP_MARKERS = ("backup", ".bak", "_bu")
+
+# Upper bound on threads used to parse changed area files
+MAX_SCAN_WORKERS = min(8, os.cpu_count() or 1)
+
+# Parsed area files: path -> (st_mtime_ns, st_size, location_id -> NPC names)
+_AREA_CACHE: Dict[str, Tuple[int, int, Dict[str, Set[str]]]] = {}
+
+# Last scan_all_modules result and the area-file fingerprint it was built from
+_SCAN_CACHE: Dict[str, object] = {"fingerprint": None, "result": None}
+
+# Joined module/other-module NPC lists, valid only for the module_unions they were built from
+_SUMMARY_CACHE: Dict[str, object] = {"unions": None, "by_module": {}}
+
+# The two stat fields the area cache compares, rebuilt from a fingerprint entry
+_FileStat = namedtuple("_FileStat", ["st_mtime_ns", "st_size"])
+
+# Deletes commas from NPC names (they would break the comma-separated output)
+_COMMA_TABLE = str.maketrans("", "", ",")
+
+def clean_npc_name(name: str) -> str:
+    """Drop any parenthetical suffix and commas from an NPC name."""
+    return name.partition("(")[0].strip().translate(_COMMA_TABLE)
+
 def extract_npcs_from_area(area_data: dict) -> Dict[str, Set[str]]:
     """
     Extract NPCs from area file structure.
@@ -33,17 +63,14 @@ def extract_npcs_from_area(area_data: dict) -> Dict[str, Set[str]]:
             if "npcs" in location and isinstance(location["npcs"], list):
                 for npc in location["npcs"]:
                     if isinstance(npc, dict) and "name" in npc:
-                        # Clean the name (remove parentheticals and commas for cleaner parsing)
-                        name = npc["name"].split("(")[0].strip()
-                        name = name.replace(",", "")  # Remove commas to avoid parsing issues
+                        name = clean_npc_name(npc["name"])
                         if name:
-                            location_npcs.add(name)
+                            location_npcs.add(sys.intern(name))
                     elif isinstance(npc, str):
                         # Sometimes NPCs are just strings
-                        name = npc.split("(")[0].strip()
-                        name = name.replace(",", "")  # Remove commas to avoid parsing issues
+                        name = clean_npc_name(npc)
                         if name:
-                            location_npcs.add(name)
+                            location_npcs.add(sys.intern(name))
             
             # Don't extract from monsters field - those are actual monsters, not NPCs
             
@@ -55,70 +82,188 @@ def extract_npcs_from_area(area_data: dict) -> Dict[str, Set[str]]:
                         if "npcs" in encounter and isinstance(encounter["npcs"], list):
                             for npc in encounter["npcs"]:
                                 if isinstance(npc, dict) and "name" in npc:
-                                    name = npc["name"].split("(")[0].strip()
-                                    name = name.replace(",", "")  # Remove commas to avoid parsing issues
+                                    name = clean_npc_name(npc["name"])
                                     if name:
-                                        location_npcs.add(name)
+                                        location_npcs.add(sys.intern(name))
             
             if location_npcs:
                 npcs_by_location[location_id] = location_npcs
     
     return npcs_by_location
 
-def scan_module_areas(module_name: str) -> Dict[str, Set[str]]:
-    """Scan all area files in a module for NPCs."""
-    all_npcs = {}
-    module_path = Path(f"modules/{module_name}")
-    areas_path = module_path / "areas"
+def iter_area_files(areas_path: str):
+    """Yield DirEntry objects for the non-backup JSON area files in an areas directory."""
+    try:
+        with os.scandir(areas_path) as entries:
+            for entry in entries:
+                if not entry.name.endswith(".json"):
+                    continue
+                # Skip backup files
+                name = entry.name.lower()
+                if any(marker in name for marker in BACKUP_MARKERS):
+                    continue
+                if entry.is_file():
+                    yield entry
+    except FileNotFoundError:
+        return
+
+def iter_module_dirs(modules_path: str):
+    """Yield DirEntry objects for module directories that have an areas subdirectory."""
+    with os.scandir(modules_path) as entries:
+        for entry in entries:
+            if entry.name.startswith(".") or not entry.is_dir():
+                continue
+            # Skip system directories
+            if entry.name in SYSTEM_DIRS:
+                continue
+            
+            # Check if it has an areas subdirectory
+            if os.path.isdir(os.path.join(entry.path, "areas")):
+                yield entry
+
+def load_area_npcs(json_path: str, st=None) -> Dict[str, Set[str]]:
+    """
+    Extract NPCs from one area file, reusing the parsed result while the
+    file's mtime and size are unchanged. st may be a stat result (or any
+    object with st_mtime_ns/st_size) the caller already has.
+    """
+    if st is None:
+        st = os.stat(json_path)
+    cached = _AREA_CACHE.get(json_path)
+    if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        return cached[2]
     
-    if not areas_path.exists():
-        return all_npcs
+    try:
+        data = safe_json_load(json_path)
+        npcs_in_area = extract_npcs_from_area(data) if data else {}
+    except Exception as e:
+        # Files that can't be loaded contribute nothing until they change
+        npcs_in_area = {}
     
-    # Process all JSON files in areas directory
-    for json_file in areas_path.glob("*.json"):
-        # Skip backup files
-        if any(skip in json_file.name.lower() for skip in ["backup", ".bak", "_bu"]):
-            continue
-            
+    _AREA_CACHE[json_path] = (st.st_mtime_ns, st.st_size, npcs_in_area)
+    return npcs_in_area
+
+def prefetch_area_files(files: List[Tuple[str, object]]) -> None:
+    """
+    Parse (path, stat) area files on a thread pool so the following
+    load_area_npcs calls hit the cache. File reads release the GIL, so the
+    I/O overlaps.
+    """
+    if len(files) < 2:
+        return
+    with ThreadPoolExecutor(max_workers=min(MAX_SCAN_WORKERS, len(files))) as executor:
+        list(executor.map(lambda file: load_area_npcs(*file), files))
+
+def merge_area_npcs(files: List[Tuple[str, object]]) -> Dict[str, FrozenSet[str]]:
+    """Merge the NPCs of several (path, stat) area files into location_id -> frozenset."""
+    all_npcs = {}
+    for json_path, st in files:
+        # Merge results (copy first - the cached sets must not be mutated)
+        for location_id, npcs in load_area_npcs(json_path, st).items():
+            if location_id in all_npcs:
+                all_npcs[location_id].update(npcs)
+            else:
+                all_npcs[location_id] = set(npcs)
+    
+    return {location_id: frozenset(npcs) for location_id, npcs in all_npcs.items()}
+
+def list_area_files(areas_path: str) -> List[Tuple[str, os.stat_result]]:
+    """List (path, stat) for each area file, skipping files that vanish mid-scan."""
+    files = []
+    for entry in iter_area_files(areas_path):
         try:
-            data = safe_json_load(json_file)
-            if data:
-                npcs_in_area = extract_npcs_from_area(data)
-                # Merge results
-                for location_id, npcs in npcs_in_area.items():
-                    if location_id in all_npcs:
-                        all_npcs[location_id].update(npcs)
-                    else:
-                        all_npcs[location_id] = npcs
-        except Exception as e:
-            # Skip files that can't be loaded
-            pass
-    
-    return all_npcs
-
-def scan_all_modules() -> Dict[str, Dict[str, Set[str]]]:
-    """Scan all modules dynamically."""
+            files.append((entry.path, entry.stat()))
+        except OSError:
+            continue
+    return files
+
+def scan_module_areas(module_name: str) -> Dict[str, FrozenSet[str]]:
+    """Scan all area files in a module for NPCs. Returns location_id -> frozenset of NPC names."""
+    return merge_area_npcs(list_area_files(os.path.join("modules", module_name, "areas")))
+
+def modules_fingerprint(modules_path: str) -> Tuple:
+    """
+    Cheap stat-only fingerprint of every area file under modules/, as
+    (module name, ((path, st_mtime_ns, st_size), ...)) pairs.
+    """
+    return tuple(
+        (module_dir.name, tuple(
+            (json_path, st.st_mtime_ns, st.st_size)
+            for json_path, st in list_area_files(os.path.join(module_dir.path, "areas"))
+        ))
+        for module_dir in iter_module_dirs(modules_path)
+    )
+
+def scan_all_modules() -> Tuple[Dict[str, Dict[str, FrozenSet[str]]], Dict[str, FrozenSet[str]], FrozenSet[str]]:
+    """
+    Scan all modules dynamically.
+    
+    Returns:
+        (per-location NPCs by module, NPC union per module, NPC union across all modules)
+    """
     all_modules = {}
-    modules_path = Path("modules")
+    module_unions = {}
+    global_union = set()
+    modules_path = "modules"
     
-    if not modules_path.exists():
-        return all_modules
+    if not os.path.isdir(modules_path):
+        return all_modules, module_unions, frozenset()
     
-    # Get all directories in modules/
-    for item in modules_path.iterdir():
-        if item.is_dir() and not item.name.startswith("."):
-            # Skip system directories
-            if item.name in ["conversation_history", "campaign_archives", "campaign_summaries"]:
-                continue
-            
-            # Check if it has an areas subdirectory
-            areas_dir = item / "areas"
-            if areas_dir.exists():
-                module_npcs = scan_module_areas(item.name)
-                if module_npcs:
-                    all_modules[item.name] = module_npcs
+    # Reuse the previous scan while no area file has been added, removed or modified
+    fingerprint = modules_fingerprint(modules_path)
+    if _SCAN_CACHE["fingerprint"] == fingerprint:
+        return _SCAN_CACHE["result"]
+    
+    # Parse every new or modified area file up front, in parallel
+    prefetch_area_files([
+        (json_path, _FileStat(mtime_ns, size))
+        for _, module_files in fingerprint
+        for json_path, mtime_ns, size in module_files
+        if _AREA_CACHE.get(json_path, (None, None))[:2] != (mtime_ns, size)
+    ])
+    
+    # Merge each module from the file list the fingerprint already gathered
+    for module_name, module_files in fingerprint:
+        module_npcs = merge_area_npcs([
+            (json_path, _FileStat(mtime_ns, size)) for json_path, mtime_ns, size in module_files
+        ])
+        if module_npcs:
+            all_modules[module_name] = module_npcs
+            # Roll up unions once here so callers never re-walk the location sets
+            module_union = set()
+            for loc_npcs in module_npcs.values():
+                module_union.update(loc_npcs)
+            module_unions[module_name] = frozenset(module_union)
+            global_union.update(module_union)
     
-    return all_modules
+    result = (all_modules, module_unions, frozenset(global_union))
+    _SCAN_CACHE["fingerprint"] = fingerprint
+    _SCAN_CACHE["result"] = result
+    return result
+
+def module_npc_summaries(current_module: str, module_unions: Dict[str, FrozenSet[str]]) -> Tuple[str, str]:
+    """
+    Comma-joined NPC lists for the current module (first 50) and for every
+    other module (first 30), each 'NONE' when empty. Cached per current
+    module until scan_all_modules produces a new result.
+    """
+    if _SUMMARY_CACHE["unions"] is not module_unions:
+        _SUMMARY_CACHE["unions"] = module_unions
+        _SUMMARY_CACHE["by_module"] = {}
+    
+    by_module = _SUMMARY_CACHE["by_module"]
+    if current_module not in by_module:
+        module_npcs = module_unions.get(current_module, frozenset())
+        other_npcs = set()
+        for module_name, module_union in module_unions.items():
+            if module_name != current_module:
+                other_npcs.update(module_union)
+        by_module[current_module] = (
+            ','.join(heapq.nsmallest(50, module_npcs)) or 'NONE',
+            # Only include first 30 from other modules to save space
+            ','.join(heapq.nsmallest(30, other_npcs)) or 'NONE'
+        )
+    return by_module[current_module]
 
 def build_npc_validation_context(current_module: str, current_location: str, party_npcs: List[str] = None) -> str:
     """
@@ -133,53 +278,28 @@ def build_npc_validation_context(current_module: str, current_location: str, par
         Compressed machine-readable context string
     """
     # Scan all modules
-    all_modules = scan_all_modules()
-    
-    # Build compressed format
-    lines = []
-    lines.append("@NPC_VALIDATION_DATA")
+    all_modules, module_unions, total_npcs = scan_all_modules()
     
     # NPCs at current location
     current_loc_npcs = []
     if current_module in all_modules and current_location in all_modules[current_module]:
         current_loc_npcs = sorted(all_modules[current_module][current_location])
-    lines.append(f"@CURRENT_LOC[{current_location}]: {','.join(current_loc_npcs) if current_loc_npcs else 'NONE'}")
-    
-    # NPCs in current module
-    module_npcs = set()
-    if current_module in all_modules:
-        for loc_npcs in all_modules[current_module].values():
-            module_npcs.update(loc_npcs)
-    lines.append(f"@CURRENT_MODULE[{current_module}]: {','.join(sorted(module_npcs)[:50]) if module_npcs else 'NONE'}")
-    
-    # Party NPCs
-    if party_npcs:
-        lines.append(f"@PARTY_NPCS: {','.join(party_npcs)}")
-    else:
-        lines.append("@PARTY_NPCS: NONE")
-    
-    # All NPCs from other modules (compressed list)
-    other_npcs = set()
-    for module_name, locations in all_modules.items():
-        if module_name != current_module:
-            for loc_npcs in locations.values():
-                other_npcs.update(loc_npcs)
     
-    # Only include first 30 from other modules to save space
-    other_npcs_list = sorted(other_npcs)[:30]
-    lines.append(f"@OTHER_MODULES: {','.join(other_npcs_list) if other_npcs_list else 'NONE'}")
+    # NPCs in current module and all NPCs from other modules (compressed lists)
+    module_npc_list, other_npc_list = module_npc_summaries(current_module, module_unions)
     
-    # Total count for reference
-    total_npcs = set()
-    for module_name, locations in all_modules.items():
-        for loc_npcs in locations.values():
-            total_npcs.update(loc_npcs)
-    lines.append(f"@TOTAL_NPC_COUNT: {len(total_npcs)}")
-    
-    # Compressed validation rules
-    lines.append("@RULES: Any listed NPC is VALID. NPCs can appear as ghosts/spirits/memories. Do NOT flag missing physical presence as error.")
-    
-    return "\n".join(lines)
+    # Build compressed format
+    return "\n".join([
+        "@NPC_VALIDATION_DATA",
+        f"@CURRENT_LOC[{current_location}]: {','.join(current_loc_npcs) if current_loc_npcs else 'NONE'}",
+        f"@CURRENT_MODULE[{current_module}]: {module_npc_list}",
+        f"@PARTY_NPCS: {','.join(party_npcs) if party_npcs else 'NONE'}",
+        f"@OTHER_MODULES: {other_npc_list}",
+        # Total count for reference
+        f"@TOTAL_NPC_COUNT: {len(total_npcs)}",
+        # Compressed validation rules
+        "@RULES: Any listed NPC is VALID. NPCs can appear as ghosts/spirits/memories. Do NOT flag missing physical presence as error."
+    ])
 
 def integrate_into_main():
     """
@@ -209,11 +329,11 @@ if __name__ == "__main__":
     print("-" * 60)
     
     # Scan all modules
-    all_modules = scan_all_modules()
+    all_modules, module_unions, _ = scan_all_modules()
     
     print(f"Found {len(all_modules)} modules with NPCs:")
     for module_name, locations in all_modules.items():
-        total_npcs = len(set(npc for loc_npcs in locations.values() for npc in loc_npcs))
+        total_npcs = len(module_unions[module_name])
         print(f"  - {module_name}: {len(locations)} locations with NPCs, {total_npcs} unique NPCs")
     
     print("\n" + "-" * 60)
@@ -13,65 +13,113 @@ Features:
 
 Usage:
   python3 core/ai/character_sheet_compressor.py --char path/to/character.json
+  python3 core/ai/character_sheet_compressor.py --chars-dir path/to/characters/ [-j 4]
 
 Optional flags:
   --keep-paren-info   Keep parenthetical info in EQUIP item names (default: removed).
+  -j, --jobs N        Worker processes for --chars-dir (default: CPU count).
 """
 
-import json, re, argparse
+import re, argparse, functools, glob, os, sys
+from multiprocessing import Pool
 from typing import Any, Dict, List, Tuple, Optional
 
+# Add project root to path for standalone execution
+if __name__ == '__main__':
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from utils.encoding_utils import fast_json_loads
+
+# Precompiled patterns (compiled once at import instead of looked up per call)
+_SLUG_RE = re.compile(r'[^a-z0-9]+')
+_PLUSN_RE = re.compile(r'\+\d+')
+_PAREN_CAPTURE_RE = re.compile(r'\(([^)]*)\)')
+_PAREN_STRIP_RE = re.compile(r'\s*\([^)]*\)')
+_PAREN_SPAN_RE = re.compile(r'\s*\(([^)]*)\)')
+_SQUEEZE_RE = re.compile(r'\bof the\b|\bof\b|\s+', re.IGNORECASE)
+_CR_SPACE_RE = re.compile(r'CR\s+')
+_DIGIT_CR_REST_RE = re.compile(r'\d|cr|rest', re.IGNORECASE)
+_APOS_RE = re.compile(r"[''']s?")
+_NONALNUM_RE = re.compile(r'[^A-Za-z0-9]+')
+_VEHICLES_RE = re.compile(r'vehicles\s*\(([^)]*)\)')
+_LEVEL_RE = re.compile(r'level')
+_THE_OR_OF_RE = re.compile(r'\bthe\b|\bof\b', re.IGNORECASE)
+_RES_TRANS = str.maketrans(' ', '_')
+
+# ASCII characters outside [a-z0-9] become spaces, so str.split() can collapse runs
+_SLUG_TABLE = str.maketrans({
+    chr(c): ' ' for c in range(128)
+    if not ('a' <= chr(c) <= 'z' or '0' <= chr(c) <= '9')
+})
+
 def slug(s: str) -> str:
-    return re.sub(r'[^a-z0-9]+', '_', str(s).lower()).strip('_')
+    s = str(s).lower()
+    if s.isascii():
+        return '_'.join(s.translate(_SLUG_TABLE).split())
+    return _SLUG_RE.sub('_', s).strip('_')
 
 def compact(s: str) -> str:
-    return re.sub(r'\s+', ' ', str(s)).strip()
+    # split() drops leading/trailing whitespace and collapses runs, like \s+ -> ' ' plus strip
+    return ' '.join(str(s).split())
 
 def strip_parens(text: str) -> Tuple[str, Optional[str]]:
     # Don't strip +N modifiers for weapons/armor
-    if re.search(r'\+\d+', text):
+    if '+' in text and _PLUSN_RE.search(text):
         return text, None
-    infos = re.findall(r'\(([^()]*)\)', text)
-    base = re.sub(r'\s*\([^)]*\)', '', text).strip()
-    return base, ('; '.join(compact(x) for x in infos) if infos else None)
+    # Single pass: each stripped span also yields its innermost parenthetical as info
+    pieces, infos, last = [], [], 0
+    for m in _PAREN_SPAN_RE.finditer(text):
+        pieces.append(text[last:m.start()])
+        infos.append(compact(m.group(1).rpartition('(')[2]))
+        last = m.end()
+    if not infos:
+        return text.strip(), None
+    pieces.append(text[last:])
+    return ''.join(pieces).strip(), '; '.join(infos)
 
+@functools.lru_cache(maxsize=4096)
 def squeeze_name(name: str) -> str:
     """Blessing of the Silent King -> BlessingSilentKing"""
-    n = re.sub(r'\bof the\b', '', name, flags=re.IGNORECASE)
-    n = re.sub(r'\bof\b', '', n, flags=re.IGNORECASE)
-    n = re.sub(r'\s+', '', n).strip()
-    return n
+    # One scan drops 'of the', 'of' and all whitespace together
+    return _SQUEEZE_RE.sub('', name)
+
+@functools.lru_cache(maxsize=4096)
+def _normalize_feat_plain(name: str) -> str:
+    """normalize_feat without ability counters (pure, so memoized)"""
+    m = _PAREN_CAPTURE_RE.search(name)
+    if m:
+        base_name = _PAREN_STRIP_RE.sub('', name).strip()
+        inner = m.group(1).strip()
+        base = squeeze_name(base_name)
+        # Replace spaces in CR values
+        inner = _CR_SPACE_RE.sub('CR', inner)
+        if _DIGIT_CR_REST_RE.search(inner):
+            return f"{base}:{inner.replace(' ', '')}"
+        return base
+    return squeeze_name(name)
 
 def normalize_feat(name: str, ability_uses: dict = None) -> str:
     """Normalize features with ability counters if available"""
-    m = re.search(r'\(([^)]*)\)', name)
-    base_name = re.sub(r'\s*\([^)]*\)', '', name).strip() if m else name
-    
     # Check if this ability has usage tracking
     if ability_uses:
-        for ability_key in ability_uses:
-            if ability_key.lower() in base_name.lower():
-                uses = ability_uses[ability_key]
+        m = _PAREN_CAPTURE_RE.search(name)
+        base_name = _PAREN_STRIP_RE.sub('', name).strip() if m else name
+        base_lower = base_name.lower()
+        for ability_key, uses in ability_uses.items():
+            if ability_key.lower() in base_lower:
                 current = uses.get('current', uses.get('uses', 0))
                 max_uses = uses.get('max', uses.get('max_uses', 0))
                 base = squeeze_name(base_name)
                 if max_uses > 0:
                     return f"{base}({current}/{max_uses})"
     
-    if m:
-        inner = m.group(1).strip()
-        base = squeeze_name(base_name)
-        # Replace spaces in CR values
-        inner = re.sub(r'CR\s+', 'CR', inner)
-        if re.search(r'\d|cr|rest', inner, flags=re.IGNORECASE):
-            return f"{base}:{inner.replace(' ', '')}"
-        return base
-    return squeeze_name(name)
+    return _normalize_feat_plain(name)
 
+@functools.lru_cache(maxsize=4096)
 def normalize_attack(name: str, kind: str, dmg_die: str, dmg_type: str, atk_bonus: int = None, dmg_bonus: int = None) -> str:
     # Remove apostrophes and special chars, then StudlyCaps
-    nm = re.sub(r"[''']s?", '', name)  # Remove apostrophes and possessives
-    nm = re.sub(r'[^A-Za-z0-9]+', ' ', nm)
+    nm = _APOS_RE.sub('', name)  # Remove apostrophes and possessives
+    nm = _NONALNUM_RE.sub(' ', nm)
     # StudlyCaps: capitalize each word
     nm = ''.join(w.capitalize() for w in nm.split())
     kind = kind.lower()
@@ -86,6 +134,19 @@ def normalize_attack(name: str, kind: str, dmg_die: str, dmg_type: str, atk_bonu
         result += f"/+{dmg_bonus}" if dmg_bonus > 0 else f"/{dmg_bonus}"
     return result
 
+# Alignment and ability shorthands (module-level so format_flatlist doesn't rebuild them)
+ALIGNMENT_SHORT = {
+    'lawful good': 'LG', 'neutral good': 'NG', 'chaotic good': 'CG',
+    'lawful neutral': 'LN', 'true neutral': 'N', 'chaotic neutral': 'CN',
+    'lawful evil': 'LE', 'neutral evil': 'NE', 'chaotic evil': 'CE'
+}
+ABILITY_SHORT = {'strength':'str', 'dexterity':'dex', 'constitution':'con',
+                 'intelligence':'int', 'wisdom':'wis', 'charisma':'cha'}
+
+def ability_abbrev(ability: str) -> str:
+    """wisdom -> wis; unknown names fall back to their first three letters"""
+    return ABILITY_SHORT.get(ability.lower()) or ability[:3].lower()
+
 def get_list(d: Dict[str, Any], *keys) -> List[Any]:
     for k in keys:
         if isinstance(d.get(k), list):
@@ -106,12 +167,7 @@ def format_flatlist(character: Dict[str, Any], keep_paren_info: bool=False) -> s
     cls  = character.get('class') or 'Unknown'
     align= character.get('alignment') or 'NE'
     # Convert alignment to shorthand
-    align_map = {
-        'lawful good': 'LG', 'neutral good': 'NG', 'chaotic good': 'CG',
-        'lawful neutral': 'LN', 'true neutral': 'N', 'chaotic neutral': 'CN', 
-        'lawful evil': 'LE', 'neutral evil': 'NE', 'chaotic evil': 'CE'
-    }
-    align = align_map.get(align.lower(), align.upper()[:2] if len(align) > 2 else align)
+    align = ALIGNMENT_SHORT.get(align.lower()) or (align.upper()[:2] if len(align) > 2 else align)
     bg   = character.get('background') or 'Unknown'
     ac   = character.get('armorClass') or 10
     spd  = character.get('speed') or 30
@@ -130,9 +186,7 @@ def format_flatlist(character: Dict[str, Any], keep_paren_info: bool=False) -> s
 
     # Saves
     saves = character.get('savingThrows') or []
-    m = {'strength':'str','dexterity':'dex','constitution':'con',
-         'intelligence':'int','wisdom':'wis','charisma':'cha'}
-    saves_out = ','.join(m.get(x.lower(), x[:3].lower()) for x in saves)
+    saves_out = ','.join(ability_abbrev(x) for x in saves)
 
     # Skills
     skills = get_dict(character, 'skills', 'SKILLS')
@@ -156,7 +210,7 @@ def format_flatlist(character: Dict[str, Any], keep_paren_info: bool=False) -> s
     tools_norm = []
     for t in tools:
         t = t.replace('gaming set', 'gaming-set')
-        t = re.sub(r'vehicles\s*\(([^)]*)\)', r'vehicles:\1', t)
+        t = _VEHICLES_RE.sub(r'vehicles:\1', t)
         tools_norm.append(t)
     prof_out = f"armor:{','.join(armor)}; weapons:{','.join(weapons)}; tools:{','.join(tools_norm)}"
 
@@ -166,7 +220,7 @@ def format_flatlist(character: Dict[str, Any], keep_paren_info: bool=False) -> s
     # Deduplicate and format resistances
     res_clean = set()
     for r in res:
-        r_lower = r.lower().replace(' from ', '_from_').replace(' ', '_')
+        r_lower = r.lower().translate(_RES_TRANS)
         # Handle "poison_from_giant_spider" -> "spider_poison"
         if 'poison_from_giant_spider' in r_lower:
             res_clean.add('spider_poison')
@@ -225,9 +279,10 @@ def format_flatlist(character: Dict[str, Any], keep_paren_info: bool=False) -> s
         atk_bonus = atk.get('attackBonus')
         dmg_bonus = atk.get('damageBonus')
         desc = (atk.get('description') or '').lower()
-        if 'spell' in desc or an.lower().strip() == 'sacred flame':
+        an_lower = an.lower()
+        if 'spell' in desc or an_lower.strip() == 'sacred flame':
             kind = 'spell'
-        elif 'ranged' in desc or 'crossbow' in an.lower():
+        elif 'ranged' in desc or 'crossbow' in an_lower:
             kind = 'ranged'
         else:
             kind = 'melee'
@@ -238,9 +293,7 @@ def format_flatlist(character: Dict[str, Any], keep_paren_info: bool=False) -> s
     sc = get_dict(character, 'spellcasting')
     ability = sc.get('ability') or 'wisdom'
     # Shorten ability names
-    ability_short = {'strength':'str', 'dexterity':'dex', 'constitution':'con',
-                     'intelligence':'int', 'wisdom':'wis', 'charisma':'cha'}
-    ability = ability_short.get(ability.lower(), ability[:3].lower())
+    ability = ability_abbrev(ability)
     dc = sc.get('spellSaveDC') or 0
     atk_bonus = sc.get('spellAttackBonus') or 0
     spellcast_out = f"{{ability:{ability},DC:{dc},ATK:+{atk_bonus}}}"
@@ -250,12 +303,12 @@ def format_flatlist(character: Dict[str, Any], keep_paren_info: bool=False) -> s
     for spell_lvl, lst in spells.items():
         if not lst:  # Skip empty spell levels
             continue
-        key = '0' if spell_lvl.lower() in ('cantrips','0') else re.sub(r'level','',spell_lvl.lower())
+        key = '0' if spell_lvl.lower() in ('cantrips','0') else _LEVEL_RE.sub('', spell_lvl.lower())
         # Fix spell name casing - remove spaces but keep capitalization
         spell_names = []
         for spell in lst:
             # Remove "the" and "of" then squish together
-            spell_norm = re.sub(r'\bthe\b|\bof\b', '', spell, flags=re.IGNORECASE)
+            spell_norm = _THE_OR_OF_RE.sub('', spell)
             spell_norm = ''.join(word.capitalize() for word in spell_norm.split())
             spell_names.append(spell_norm)
         spells_parts.append(f"{key}:[{','.join(spell_names)}]")
@@ -275,29 +328,56 @@ def format_flatlist(character: Dict[str, Any], keep_paren_info: bool=False) -> s
     bonds  = character.get('bonds') or ''
     flaws  = character.get('flaws') or ''
 
-    out = []
-    out.append(f"CHAR={name}; LVL={lvl}; RACE={race}; CLASS={cls}; ALIGN={align}; BG={bg}; AC={ac}; SPD={spd}; STATUS={status}; CONDITION={condition}; AFFECTED={affected};")
-    out.append(f"STATS={{STR:{STR},DEX:{DEX},CON:{CON},INT:{INT},WIS:{WIS},CHA:{CHA}}}; SAVES={saves_out}; SKILLS={{{skills_out}}}; PROF+{prof_bonus};")
-    out.append(f"SENSES={{darkvision:{darkv},PP:{pp}}}; LANG={langs_out};")
-    out.append(f"PROF={{{prof_out}}};")
-    out.append(f"VULN={vuln}; RES={res_out}; IMM=; COND_IMM={cimm_out};")
-    out.append(f"CLASSFEAT={classfeat_out};")
-    out.append(f"EQUIP={equip_out};")
-    out.append(f"ATK={atk_out};")
-    out.append(f"SPELLCAST={spellcast_out};")
-    out.append(f"SPELLS={spells_out};")
-    out.append(f"CURRENCY={currency_out};")
-    out.append(f"TRAITS={traits}; IDEALS={ideals}; BONDS={bonds}; FLAWS={flaws};")
-    return '\n'.join(out)
+    # Adjacent f-strings compile into a single string build - no tuple, no join
+    return (
+        f"CHAR={name}; LVL={lvl}; RACE={race}; CLASS={cls}; ALIGN={align}; BG={bg}; AC={ac}; SPD={spd}; STATUS={status}; CONDITION={condition}; AFFECTED={affected};\n"
+        f"STATS={{STR:{STR},DEX:{DEX},CON:{CON},INT:{INT},WIS:{WIS},CHA:{CHA}}}; SAVES={saves_out}; SKILLS={{{skills_out}}}; PROF+{prof_bonus};\n"
+        f"SENSES={{darkvision:{darkv},PP:{pp}}}; LANG={langs_out};\n"
+        f"PROF={{{prof_out}}};\n"
+        f"VULN={vuln}; RES={res_out}; IMM=; COND_IMM={cimm_out};\n"
+        f"CLASSFEAT={classfeat_out};\n"
+        f"EQUIP={equip_out};\n"
+        f"ATK={atk_out};\n"
+        f"SPELLCAST={spellcast_out};\n"
+        f"SPELLS={spells_out};\n"
+        f"CURRENCY={currency_out};\n"
+        f"TRAITS={traits}; IDEALS={ideals}; BONDS={bonds}; FLAWS={flaws};"
+    )
+
+def load_character(path: str) -> Dict[str, Any]:
+    """Load a character JSON file, parsing with orjson when available"""
+    with open(path, 'rb') as f:
+        return fast_json_loads(f.read())
+
+def compress_character_file(path: str, keep_paren_info: bool = False) -> Tuple[str, str]:
+    """Load and compress one sheet; module-level so Pool workers can pickle it"""
+    return path, format_flatlist(load_character(path), keep_paren_info=keep_paren_info)
 
 def main():
     ap = argparse.ArgumentParser()
-    ap.add_argument('--char', required=True, help='Path to character JSON')
+    source = ap.add_mutually_exclusive_group(required=True)
+    source.add_argument('--char', help='Path to character JSON')
+    source.add_argument('--chars-dir', help='Compress every *.json character in this directory')
+    ap.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1, help='Worker processes for --chars-dir')
     ap.add_argument('--keep-paren-info', action='store_true', help='Keep parenthetical info in EQUIP item names')
     args = ap.parse_args()
-    with open(args.char, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    print(format_flatlist(data, keep_paren_info=args.keep_paren_info))
+    if args.char:
+        data = load_character(args.char)
+        print(format_flatlist(data, keep_paren_info=args.keep_paren_info))
+        return
+
+    paths = sorted(glob.glob(os.path.join(args.chars_dir, '*.json')))
+    worker = functools.partial(compress_character_file, keep_paren_info=args.keep_paren_info)
+    if args.jobs > 1 and len(paths) > 1:
+        # Sheets are independent; imap keeps the output in path order
+        with Pool(min(args.jobs, len(paths))) as pool:
+            results = pool.imap(worker, paths, chunksize=8)
+            for path, out in results:
+                print(f"=== {path} ===\n{out}")
+    else:
+        for path in paths:
+            _, out = worker(path)
+            print(f"=== {path} ===\n{out}")
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
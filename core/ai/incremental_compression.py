@@ -5,9 +5,11 @@ Filters validation errors and preserves recent valid context.
 """
 
 import json
+import hashlib
 import os
 import sys
 from datetime import datetime
+from pathlib import Path
 from typing import List, Dict, Optional, Tuple
 from core.ai.llm_client import get_llm_client
 import shutil
@@ -17,54 +19,231 @@ if __name__ == "__main__":
     sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 import config
-from utils.encoding_utils import safe_json_load, safe_json_dump
+from model_config import NARRATIVE_COMPRESSION_MODEL
+from utils.encoding_utils import safe_json_load, safe_json_dump, fast_json_loads
 from utils.enhanced_logger import info, debug, warning, error
 
+# Message markers. Plain substring tests (C fastsearch) beat a compiled regex
+# alternation here, so each role only checks the markers that apply to it.
+VALIDATION_ERROR_MARKER = "Error Note: Your previous response failed validation"
+TRANSITION_MARKER = "Location transition:"
+ARRIVAL_MARKER = "arrived at"
+
+# Static instructions that follow the conversation in every compression prompt
+COMPRESSION_PROMPT_TAIL = """
+
+Create a compressed narrative that:
+1. Preserves all key events, decisions, and outcomes
+2. Maintains story continuity and character development
+3. Keeps track of items gained/lost and inventory changes
+4. Notes all NPC interactions and important dialogue
+5. Records combat results, damage taken, and resources used
+6. Documents any plot revelations or quest progress
+7. Maintains emotional beats and character relationships
+
+Format as a flowing narrative in 2-3 paragraphs. Focus on what happened, not meta-game mechanics."""
+
 class IncrementalLocationCompressor:
     """Handles incremental compression of messages at current location."""
     
     def __init__(self):
         self.client = get_llm_client()
-        self.COMPRESSION_MODEL = "gpt-4.1-mini-2025-04-14"
+        self.COMPRESSION_MODEL = NARRATIVE_COMPRESSION_MODEL  # Fast tier of the active provider
         self.COMPRESSION_TEMP = 0.3
+        self.COMPRESSION_TIMEOUT = 30  # Seconds; a slow call just skips this compression
         self.TRIGGER_THRESHOLD = 15  # Compress when reaching 15 pairs
         self.PRESERVE_RECENT = 5     # Always keep last 5 VALID pairs uncompressed
-        
+        self.CACHE_MAX_ENTRIES = 50  # Oldest summaries are dropped beyond this
+        self.MAX_BACKUPS = 5         # Timestamped history backups kept on disk
+        self.enable_caching = True
+        self.cache_file = Path("modules/conversation_history/incremental_compression_cache.json")
+        self.cache = self._load_cache()
+        self._party_cache = None  # ((mtime_ns, size), party tracker data)
+        self._scan_cache = self._new_scan(None)
+        
+    def _load_cache(self) -> Dict[str, str]:
+        """Load the summary cache (prompt hash -> LLM summary)."""
+        if self.cache_file.exists():
+            try:
+                with open(self.cache_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except:
+                return {}
+        return {}
+    
+    def _save_cache(self):
+        """Save the summary cache, keeping only the newest entries."""
+        while len(self.cache) > self.CACHE_MAX_ENTRIES:
+            del self.cache[next(iter(self.cache))]
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.cache_file, 'w', encoding='utf-8') as f:
+                json.dump(self.cache, f, indent=2, ensure_ascii=False)
+        except OSError as e:
+            warning(f"Could not save compression cache: {e}")
+    
+    def _get_content_hash(self, content: str) -> str:
+        """Generate MD5 hash of content for caching."""
+        return hashlib.md5(content.encode('utf-8')).hexdigest()
+    
+    def _load_party(self) -> Optional[Dict]:
+        """Load party_tracker.json, reusing the parsed copy while the file is unchanged."""
+        try:
+            st = os.stat("party_tracker.json")
+        except OSError:
+            return safe_json_load("party_tracker.json")
+        key = (st.st_mtime_ns, st.st_size)
+        if self._party_cache is not None and self._party_cache[0] == key:
+            return self._party_cache[1]
+        party_data = safe_json_load("party_tracker.json")
+        self._party_cache = (key, party_data)
+        return party_data
+    
+    def cleanup_old_backups(self, directory: str):
+        """Remove old conversation history backups, keeping the newest MAX_BACKUPS."""
+        try:
+            backup_files = []
+            for file in os.listdir(directory):
+                if file.startswith("conversation_history_backup_") and file.endswith(".json"):
+                    backup_path = os.path.join(directory, file)
+                    backup_files.append((os.path.getmtime(backup_path), backup_path))
+            
+            # Sort by modification time (newest first) and remove old ones
+            backup_files.sort(reverse=True)
+            for _, old_backup in backup_files[self.MAX_BACKUPS:]:
+                try:
+                    os.remove(old_backup)
+                    debug(f"Removed old backup: {os.path.basename(old_backup)}")
+                except OSError as e:
+                    warning(f"Could not remove old backup: {e}")
+        except OSError as e:
+            warning(f"Backup cleanup failed: {e}")
+    
     def is_validation_error(self, msg: Dict) -> bool:
         """Check if a message is a validation error."""
         if msg.get("role") == "user":
             content = msg.get("content", "")
-            return "Error Note: Your previous response failed validation" in content
+            return VALIDATION_ERROR_MARKER in content
         return False
     
-    def filter_validation_errors(self, messages: List[Dict]) -> List[Dict]:
-        """Remove validation error pairs from messages."""
-        filtered = []
-        i = 0
-        while i < len(messages):
-            # Check if this is a validation error message
-            if self.is_validation_error(messages[i]):
-                # Skip this message, but DON'T skip the previous assistant message
-                # because we need to track what the assistant tried
-                i += 1
-                continue
-            
-            # Check if next message is a validation error
-            if i + 1 < len(messages) and self.is_validation_error(messages[i + 1]):
-                # Include this message but mark that next will be skipped
-                filtered.append(messages[i])
-                i += 1  # Move to the error message, which will be skipped in next iteration
+    @staticmethod
+    def _new_scan(messages: Optional[List[Dict]]) -> Dict:
+        """Empty scan state for a message list."""
+        return {
+            "messages": messages,
+            "len": 0,
+            "last_msg": None,
+            "is_err": [],
+            "is_transition": [],
+            "valid_pairs": 0,
+            "pending_user": False,
+            "last_transition_idx": 0,
+            # Same facts restricted to the segment since the last transition
+            "segment_pairs": 0,
+            "segment_pending_user": False,
+            # Index just past each user->assistant pair that find_compression_range's
+            # walk would count, so the compression boundary is a list lookup
+            "segment_pair_ends": [],
+            "walk_pending_user": False
+        }
+    
+    def _scan(self, messages: List[Dict]) -> Dict:
+        """
+        Classify messages and count valid pairs, reusing the previous scan.
+        The history only grows between saves, so just the appended tail is
+        classified; any other change to the list triggers a full rescan.
+        Editing earlier messages in place (replacing their content) is not
+        detected - reset self._scan_cache with _new_scan(None) after doing so.
+        """
+        scan = self._scan_cache
+        seen = scan["len"]
+        if (scan["messages"] is not messages or len(messages) < seen
+                or (seen and messages[seen - 1] is not scan["last_msg"])):
+            scan = self._scan_cache = self._new_scan(messages)
+            seen = 0
+        
+        is_err = scan["is_err"]
+        is_transition = scan["is_transition"]
+        valid_pairs = scan["valid_pairs"]
+        pending_user = scan["pending_user"]
+        last_transition_idx = scan["last_transition_idx"]
+        segment_pairs = scan["segment_pairs"]
+        segment_pending_user = scan["segment_pending_user"]
+        segment_pair_ends = scan["segment_pair_ends"]
+        walk_pending_user = scan["walk_pending_user"]
+        for i in range(seen, len(messages)):
+            msg = messages[i]
+            role = msg.get("role")
+            err = transition = False
+            if role == "user":
+                content = msg.get("content", "")
+                err = VALIDATION_ERROR_MARKER in content
+                transition = TRANSITION_MARKER in content
+            elif role == "system":
+                transition = ARRIVAL_MARKER in msg.get("content", "").lower()
+            is_err.append(err)
+            is_transition.append(transition)
+            if transition:
+                # A new segment starts at the transition message itself
+                last_transition_idx = i
+                segment_pairs = 0
+                segment_pending_user = False
+                segment_pair_ends = []
+                walk_pending_user = False
+            if not err:
+                # Same greedy user->assistant pairing as count_valid_conversation_pairs
+                if pending_user and role == "assistant":
+                    valid_pairs += 1
+                    pending_user = False
+                else:
+                    pending_user = role == "user"
+                if segment_pending_user and role == "assistant":
+                    segment_pairs += 1
+                    segment_pending_user = False
+                else:
+                    segment_pending_user = role == "user"
+            # find_compression_range pairs adjacent raw messages, skipping errors
+            if walk_pending_user and role == "assistant":
+                segment_pair_ends.append(i + 1)
+                walk_pending_user = False
             else:
-                # Normal message, include it
-                filtered.append(messages[i])
-                i += 1
-                
-        return filtered
+                walk_pending_user = role == "user" and not err
+        
+        scan["len"] = len(messages)
+        scan["last_msg"] = messages[-1] if messages else None
+        scan["valid_pairs"] = valid_pairs
+        scan["pending_user"] = pending_user
+        scan["last_transition_idx"] = last_transition_idx
+        scan["segment_pairs"] = segment_pairs
+        scan["segment_pending_user"] = segment_pending_user
+        scan["segment_pair_ends"] = segment_pair_ends
+        scan["walk_pending_user"] = walk_pending_user
+        return scan
+    
+    def prune_stale_errors(self, messages: List[Dict], keep_tail: int = 10) -> List[Dict]:
+        """
+        Drop validation error messages older than the last keep_tail messages.
+        The tail is kept verbatim; returns the input list when nothing was pruned.
+        """
+        cut = max(len(messages) - keep_tail, 0)
+        pruned = [msg for msg in messages[:cut] if not self.is_validation_error(msg)]
+        if len(pruned) == cut:
+            return messages
+        pruned += messages[cut:]
+        return pruned
+    
+    def filter_validation_errors(self, messages: List[Dict], mask: Optional[List[bool]] = None) -> List[Dict]:
+        """Remove validation error pairs from messages."""
+        if mask is None:
+            mask = [self.is_validation_error(msg) for msg in messages]
+        # Skip the error messages themselves, but DON'T skip the previous assistant
+        # message because we need to track what the assistant tried
+        return [msg for msg, is_err in zip(messages, mask) if not is_err]
     
-    def count_valid_conversation_pairs(self, messages: List[Dict]) -> int:
+    def count_valid_conversation_pairs(self, messages: List[Dict], mask: Optional[List[bool]] = None) -> int:
         """Count user-assistant pairs, excluding validation errors."""
         # First filter out validation errors
-        valid_messages = self.filter_validation_errors(messages)
+        valid_messages = self.filter_validation_errors(messages, mask)
         
         pairs = 0
         i = 0
@@ -78,17 +257,16 @@ class IncrementalLocationCompressor:
     
     def should_compress(self, messages: List[Dict]) -> bool:
         """Check if we should trigger compression based on VALID pairs."""
-        valid_pairs = self.count_valid_conversation_pairs(messages)
-        return valid_pairs >= self.TRIGGER_THRESHOLD
+        return self._scan(messages)["valid_pairs"] >= self.TRIGGER_THRESHOLD
     
-    def find_compression_range(self, messages: List[Dict]) -> Optional[Tuple[int, int, List[Dict]]]:
+    def find_compression_range(self, messages: List[Dict], mask: Optional[List[bool]] = None) -> Optional[Tuple[int, int, List[Dict]]]:
         """
         Find the range of messages to compress.
         Returns: (start_idx, end_idx, filtered_messages_to_compress)
         """
-        # Filter validation errors for counting
-        valid_messages = self.filter_validation_errors(messages)
-        valid_pairs = self.count_valid_conversation_pairs(messages)
+        if mask is None:
+            mask = [self.is_validation_error(msg) for msg in messages]
+        valid_pairs = self.count_valid_conversation_pairs(messages, mask)
         
         if valid_pairs < self.TRIGGER_THRESHOLD:
             return None
@@ -106,7 +284,7 @@ class IncrementalLocationCompressor:
         i = 0
         while i < len(messages) - 1 and pairs_found < pairs_to_compress:
             # Skip validation error messages for pair counting
-            if self.is_validation_error(messages[i]):
+            if mask[i]:
                 i += 1
                 continue
                 
@@ -124,70 +302,112 @@ class IncrementalLocationCompressor:
             
         # Extract messages to compress and filter out validation errors
         messages_to_compress = messages[:compress_until_idx]
-        filtered_to_compress = self.filter_validation_errors(messages_to_compress)
+        filtered_to_compress = self.filter_validation_errors(messages_to_compress, mask[:compress_until_idx])
         
         return (0, compress_until_idx, filtered_to_compress)
     
+    def _segment_compression_range(self, messages: List[Dict], scan: Dict) -> Optional[Tuple[int, int, List[Dict]]]:
+        """
+        find_compression_range for the segment since the last transition, answered
+        from the scan. Indices are relative to that segment.
+        """
+        valid_pairs = scan["segment_pairs"]
+        if valid_pairs < self.TRIGGER_THRESHOLD:
+            return None
+        
+        pairs_to_compress = valid_pairs - self.PRESERVE_RECENT
+        if pairs_to_compress <= 0:
+            return None
+        
+        pair_ends = scan["segment_pair_ends"]
+        if len(pair_ends) < pairs_to_compress:
+            return None
+        
+        start = scan["last_transition_idx"]
+        compress_until_idx = pair_ends[pairs_to_compress - 1] - start
+        filtered_to_compress = self.filter_validation_errors(
+            messages[start:start + compress_until_idx], scan["is_err"][start:start + compress_until_idx]
+        )
+        return (0, compress_until_idx, filtered_to_compress)
+    
+    def _compression_lengths(self, scan: Dict, removed_start: int, removed_end: int, compressed: Dict) -> Tuple[int, int]:
+        """Character counts before and after replacing messages[removed_start:removed_end] with the summary."""
+        # Measured from the current contents, which in-place edits may have changed since the scan
+        lengths = [len(msg.get("content", "")) for msg in scan["messages"]]
+        removed = sum(lengths[removed_start:removed_end])
+        original_length = sum(lengths)
+        return original_length, original_length - removed + len(compressed["content"])
+    
     def compress_messages(self, messages: List[Dict], location_info: Dict) -> Optional[Dict]:
         """Compress a segment of messages into a summary."""
         
-        # Build context for compression
+        # Build context for compression. Prefixes and contents are appended
+        # separately and joined once, so no per-message string is built.
         context_parts = []
+        add = context_parts.append
         for msg in messages:
             role = msg["role"]
             content = msg["content"]
             if role == "user":
                 # Skip location transition messages
-                if "Location transition:" in content:
+                if TRANSITION_MARKER in content:
                     continue
-                context_parts.append(f"Player: {content}")
+                prefix = "Player: "
             elif role == "assistant":
+                prefix = "DM: "
                 # Extract narration from JSON responses if present
                 if content.startswith("{") and "narration" in content:
                     try:
-                        data = json.loads(content)
+                        data = fast_json_loads(content)
                         narration = data.get("narration", content)
-                        context_parts.append(f"DM: {narration}")
+                        content = narration if isinstance(narration, str) else str(narration)
                     except:
-                        context_parts.append(f"DM: {content}")
-                else:
-                    context_parts.append(f"DM: {content}")
+                        pass
             elif role == "system":
                 # Include important system messages
-                if "arrived at" in content.lower() or "summary" in content.lower():
-                    context_parts.append(f"System: {content}")
+                content_lower = content.lower()
+                if not (ARRIVAL_MARKER in content_lower or "summary" in content_lower):
+                    continue
+                prefix = "System: "
+            else:
+                continue
+            if context_parts:
+                add("\n\n")
+            add(prefix)
+            add(content)
         
         if not context_parts:
             warning("No content to compress after filtering")
             return None
             
-        full_context = "\n\n".join(context_parts)
-        
-        compression_prompt = f"""Compress this D&D 5e game segment into a narrative summary.
+        prompt_head = f"""Compress this D&D 5e game segment into a narrative summary.
 
 Location: {location_info.get('name', 'Unknown')} ({location_info.get('id', 'Unknown')})
 Description: {location_info.get('description', 'No description')}
 
 CONVERSATION TO COMPRESS:
-{full_context}
-
-Create a compressed narrative that:
-1. Preserves all key events, decisions, and outcomes
-2. Maintains story continuity and character development
-3. Keeps track of items gained/lost and inventory changes
-4. Notes all NPC interactions and important dialogue
-5. Records combat results, damage taken, and resources used
-6. Documents any plot revelations or quest progress
-7. Maintains emotional beats and character relationships
-
-Format as a flowing narrative in 2-3 paragraphs. Focus on what happened, not meta-game mechanics."""
+"""
+        # The context pieces go straight into the prompt; no joined copy in between
+        compression_prompt = "".join((prompt_head, *context_parts, COMPRESSION_PROMPT_TAIL))
 
+        # Identical segments (retries, replayed backups) reuse the earlier summary
+        cache_key = self._get_content_hash(f"{self.COMPRESSION_MODEL}\n{compression_prompt}")
+        response = self.cache.get(cache_key) if self.enable_caching else None
+        
         try:
-            response = self.client.chat.completions.create(
-                messages=[{"role": "user", "content": compression_prompt}],
-                model=self.COMPRESSION_MODEL,
-                temperature=self.COMPRESSION_TEMP
-            ).choices[0].message.content
+            if response:
+                debug("Using cached compression summary")
+            else:
+                response = self.client.chat.completions.create(
+                    messages=[{"role": "user", "content": compression_prompt}],
+                    model=self.COMPRESSION_MODEL,
+                    temperature=self.COMPRESSION_TEMP,
+                    timeout=self.COMPRESSION_TIMEOUT
+                ).choices[0].message.content
+                
+                if self.enable_caching and response and response.strip():
+                    self.cache[cache_key] = response
+                    self._save_cache()
             
             if response and response.strip():
                 location_id = location_info.get('id', 'Unknown')
@@ -216,8 +436,12 @@ Format as a flowing narrative in 2-3 paragraphs. Focus on what happened, not met
         if not messages:
             return None
             
+        # One scan supplies the masks, pair counts and compression boundary;
+        # it carries over from earlier calls
+        scan = self._scan(messages)
+        
         # Count valid pairs
-        valid_pairs = self.count_valid_conversation_pairs(messages)
+        valid_pairs = scan["valid_pairs"]
         debug(f"Valid conversation pairs (excluding errors): {valid_pairs}")
         
         if valid_pairs < self.TRIGGER_THRESHOLD:
@@ -225,19 +449,13 @@ Format as a flowing narrative in 2-3 paragraphs. Focus on what happened, not met
             return None
         
         # Find last location transition
-        last_transition_idx = 0
-        for i, msg in enumerate(messages):
-            if msg.get("role") == "system" and "arrived at" in msg.get("content", "").lower():
-                last_transition_idx = i
-            elif msg.get("role") == "user" and "Location transition:" in msg.get("content", ""):
-                last_transition_idx = i
+        last_transition_idx = scan["last_transition_idx"]
         
-        # Get messages since last transition
-        current_segment = messages[last_transition_idx:]
-        debug(f"Messages at current location: {len(current_segment)}")
+        # Messages since last transition (not copied; indexed from last_transition_idx)
+        debug(f"Messages at current location: {len(messages) - last_transition_idx}")
         
         # Get current location info
-        party_data = safe_json_load("party_tracker.json")
+        party_data = self._load_party()
         location_info = {
             "id": party_data.get("worldConditions", {}).get("currentLocationId", "Unknown"),
             "name": party_data.get("worldConditions", {}).get("currentLocationName", "Unknown Location"),
@@ -245,7 +463,7 @@ Format as a flowing narrative in 2-3 paragraphs. Focus on what happened, not met
         }
         
         # Find compression range
-        compress_result = self.find_compression_range(current_segment)
+        compress_result = self._segment_compression_range(messages, scan)
         if not compress_result:
             debug("Could not find enough valid pairs to compress")
             return None
@@ -258,22 +476,15 @@ Format as a flowing narrative in 2-3 paragraphs. Focus on what happened, not met
         if not compressed:
             return None
         
-        # Build new message list
-        new_messages = messages[:last_transition_idx]
-        
-        # Add location transition if exists
-        if last_transition_idx > 0:
-            new_messages.append(messages[last_transition_idx])
-        
-        # Add compressed summary
+        # Build new message list: everything before the current location plus its
+        # transition message if it exists, the summary, then the uncompressed tail
+        keep = last_transition_idx + 1 if last_transition_idx > 0 else 0
+        new_messages = messages[:keep]
         new_messages.append(compressed)
-        
-        # Add remaining messages
-        new_messages.extend(current_segment[end:])
+        new_messages += messages[last_transition_idx + end:]
         
         # Log compression stats
-        original_length = sum(len(m.get("content", "")) for m in messages)
-        new_length = sum(len(m.get("content", "")) for m in new_messages)
+        original_length, new_length = self._compression_lengths(scan, keep, last_transition_idx + end, compressed)
         compression_ratio = (1 - new_length / original_length) * 100
         
         info(f"Compressed {len(messages)} messages to {len(new_messages)} (ratio: {compression_ratio:.1f}%)")
@@ -283,11 +494,6 @@ Format as a flowing narrative in 2-3 paragraphs. Focus on what happened, not met
     def apply_compression(self, conversation_file: str = "modules/conversation_history/conversation_history.json"):
         """Apply incremental compression to actual conversation history."""
         
-        # Create backup first
-        backup_file = f"modules/conversation_history/conversation_history_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        info(f"Creating backup: {backup_file}")
-        shutil.copy2(conversation_file, backup_file)
-        
         # Load conversation
         messages = safe_json_load(conversation_file)
         if not messages:
@@ -301,36 +507,36 @@ Format as a flowing narrative in 2-3 paragraphs. Focus on what happened, not met
         if not messages:
             warning("No messages in conversation history")
             return False
+        
+        # Old validation errors are never compressed or counted; drop them for good
+        pruned = self.prune_stale_errors(messages)
+        if len(pruned) != len(messages):
+            info(f"Pruned {len(messages) - len(pruned)} stale validation errors")
+            messages = pruned
             
         info(f"Total messages: {len(messages)}")
         
+        # One scan supplies the masks, pair counts and compression boundary
+        scan = self._scan(messages)
+        
         # Count valid pairs
-        valid_pairs = self.count_valid_conversation_pairs(messages)
+        valid_pairs = scan["valid_pairs"]
         info(f"Valid conversation pairs (excluding errors): {valid_pairs}")
         
-        if not self.should_compress(messages):
+        if valid_pairs < self.TRIGGER_THRESHOLD:
             info(f"Not enough valid pairs for compression (need {self.TRIGGER_THRESHOLD}, have {valid_pairs})")
             return False
         
         # Find last location transition
-        last_transition_idx = 0
-        current_location_msg = None
-        for i, msg in enumerate(messages):
-            if msg.get("role") == "system" and "arrived at" in msg.get("content", "").lower():
-                last_transition_idx = i
-                current_location_msg = msg
-            elif msg.get("role") == "user" and "Location transition:" in msg.get("content", ""):
-                last_transition_idx = i
-                current_location_msg = msg
+        last_transition_idx = scan["last_transition_idx"]
         
         info(f"Last location transition at index: {last_transition_idx}")
         
-        # Get messages since last transition
-        current_segment = messages[last_transition_idx:]
-        info(f"Messages at current location: {len(current_segment)}")
+        # Messages since last transition (not copied; indexed from last_transition_idx)
+        info(f"Messages at current location: {len(messages) - last_transition_idx}")
         
         # Get current location info
-        party_data = safe_json_load("party_tracker.json")
+        party_data = self._load_party()
         location_info = {
             "id": party_data.get("worldConditions", {}).get("currentLocationId", "Unknown"),
             "name": party_data.get("worldConditions", {}).get("currentLocationName", "Unknown Location"),
@@ -340,14 +546,14 @@ Format as a flowing narrative in 2-3 paragraphs. Focus on what happened, not met
         info(f"Current location: {location_info['name']} ({location_info['id']})")
         
         # Find compression range in current segment
-        compress_result = self.find_compression_range(current_segment)
+        compress_result = self._segment_compression_range(messages, scan)
         if not compress_result:
             warning("Could not find enough valid pairs to compress")
             return False
         
         start, end, filtered_to_compress = compress_result
         info(f"Compressing messages {start} to {end} in current segment")
-        info(f"Filtered {len(current_segment[:end]) - len(filtered_to_compress)} validation errors")
+        info(f"Filtered {end - len(filtered_to_compress)} validation errors")
         
         # Perform compression
         info(f"Compressing {len(filtered_to_compress)} messages...")
@@ -356,22 +562,15 @@ Format as a flowing narrative in 2-3 paragraphs. Focus on what happened, not met
             error("Compression failed")
             return False
         
-        # Build new message list
-        new_messages = messages[:last_transition_idx]  # Keep everything before current location
-        
-        # Add location transition if it exists
-        if current_location_msg and last_transition_idx > 0:
-            new_messages.append(current_location_msg)
-        
-        # Add compressed summary
+        # Build new message list: everything before the current location plus its
+        # transition message if it exists, the summary, then the uncompressed tail
+        keep = last_transition_idx + 1 if last_transition_idx > 0 else 0
+        new_messages = messages[:keep]
         new_messages.append(compressed)
-        
-        # Add remaining messages (those not compressed)
-        new_messages.extend(current_segment[end:])
+        new_messages += messages[last_transition_idx + end:]
         
         # Calculate compression stats
-        original_length = sum(len(m.get("content", "")) for m in messages)
-        new_length = sum(len(m.get("content", "")) for m in new_messages)
+        original_length, new_length = self._compression_lengths(scan, keep, last_transition_idx + end, compressed)
         compression_ratio = (1 - new_length / original_length) * 100
         
         info(f"\n=== COMPRESSION RESULTS ===")
@@ -381,8 +580,23 @@ Format as a flowing narrative in 2-3 paragraphs. Focus on what happened, not met
         info(f"Character reduction: {original_length} -> {new_length}")
         info(f"Compression ratio: {compression_ratio:.1f}%")
         
-        # Save compressed version back to original file
-        safe_json_dump(new_messages, conversation_file)
+        # Create backup. Hardlink instead of copying: it is taken only here,
+        # right before the save swaps a new file into place, so the backup
+        # keeps the old inode and contents. Anything that rewrote the file in
+        # place (main.save_conversation_history) would change a hardlink too.
+        backup_file = f"modules/conversation_history/conversation_history_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        info(f"Creating backup: {backup_file}")
+        try:
+            os.link(conversation_file, backup_file)
+        except OSError:
+            shutil.copy2(conversation_file, backup_file)
+        self.cleanup_old_backups(os.path.dirname(backup_file))
+        
+        # Save compressed version back to original file. Write to a temp file and
+        # swap it in so the hardlinked backup is never truncated.
+        temp_file = f"{conversation_file}.tmp"
+        safe_json_dump(new_messages, temp_file)
+        os.replace(temp_file, conversation_file)
         info(f"\nCompressed conversation saved to: {conversation_file}")
         info(f"Backup preserved at: {backup_file}")
         
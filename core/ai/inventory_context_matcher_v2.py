@@ -5,54 +5,130 @@ Indexes player's inventory and intelligently matches against player text
 """
 
 import re
+import string
+from functools import lru_cache
 from typing import List, Dict, Tuple, Set
+from collections import Counter
 from difflib import SequenceMatcher
 
+try:
+    from rapidfuzz import fuzz
+    RAPIDFUZZ_AVAILABLE = True
+except ImportError:
+    RAPIDFUZZ_AVAILABLE = False
+
+_CLEAN_RE = re.compile(r'[^a-z0-9]')
+_WORD_RE = re.compile(r'\b\w+\b')
+# For ASCII text \w is exactly [A-Za-z0-9_], so mapping every other ASCII
+# character to a space and splitting yields the same tokens as _WORD_RE
+_ASCII_WORD_CHARS = set(string.ascii_letters + string.digits + '_')
+_NON_WORD_TO_SPACE = str.maketrans({chr(c): ' ' for c in range(128) if chr(c) not in _ASCII_WORD_CHARS})
+
+@lru_cache(maxsize=4096)
+def _clean_word(word: str) -> str:
+    # Players reuse a small vocabulary, so most words are cleaned from cache
+    return _CLEAN_RE.sub('', word.lower())
+
+def _tokenize(text: str) -> List[str]:
+    """Split text into word tokens - same result as _WORD_RE.findall(text)"""
+    if text.isascii():
+        return text.translate(_NON_WORD_TO_SPACE).split()
+    return _WORD_RE.findall(text)
+
 class InventoryContextMatcherV2:
+    # Common words to ignore in matching - more selective list
+    STOP_WORDS = frozenset({
+        'i', 'me', 'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at',
+        'to', 'for', 'of', 'by', 'from', 'as', 'is', 'was', 'are', 'were',
+        'been', 'be', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would',
+        'could', 'should', 'may', 'might', 'must', 'can', 'cant', 'lets', 'let',
+        'well', 'done', 'yes', 'no', 'ok', 'okay', 'sure', 'yeah', 'nope',
+        'this', 'that', 'these', 'those', 'there', 'here', 'where', 'when',
+        'who', 'what', 'which', 'why', 'how', 'all', 'any', 'some', 'very',
+        'too', 'also', 'just', 'only', 'still', 'now', 'then', 'out', 'up',
+        'down', 'into', 'over', 'under', 'again', 'after', 'before', 'team'
+    })
+    
+    # Combat-related keywords for context prioritization
+    COMBAT_KEYWORDS = frozenset({
+        'attack', 'strike', 'hit', 'swing', 'fire', 'shoot', 'block', 'defend',
+        'damage', 'hurt', 'wound', 'fight', 'combat', 'battle', 'guard'
+    })
+    
+    # Item type priorities for different contexts
+    CONTEXT_PRIORITIES = {
+        'combat': ('weapon', 'armor', 'shield', 'consumable'),
+        'general': ('equipment', 'consumable', 'misc', 'tool')
+    }
+    
+    # Item types that get a context boost when scoring
+    COMBAT_ITEM_TYPES = frozenset({'weapon', 'armor', 'shield'})
+    GENERAL_ITEM_TYPES = frozenset({'equipment', 'consumable', 'tool'})
+    
+    # Size limits for the per-matcher token and importance caches
+    ITEM_TOKEN_CACHE_MAX = 1024
+    WORD_IMPORTANCE_CACHE_MAX = 4096
+
     def __init__(self, similarity_threshold: float = 0.65, max_matches: int = 5):
         self.similarity_threshold = similarity_threshold
         self.max_matches = max_matches
         
-        # Common words to ignore in matching - more selective list
-        self.stop_words = {
-            'i', 'me', 'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at',
-            'to', 'for', 'of', 'by', 'from', 'as', 'is', 'was', 'are', 'were',
-            'been', 'be', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would',
-            'could', 'should', 'may', 'might', 'must', 'can', 'cant', 'lets', 'let',
-            'well', 'done', 'yes', 'no', 'ok', 'okay', 'sure', 'yeah', 'nope',
-            'this', 'that', 'these', 'those', 'there', 'here', 'where', 'when',
-            'who', 'what', 'which', 'why', 'how', 'all', 'any', 'some', 'very',
-            'too', 'also', 'just', 'only', 'still', 'now', 'then', 'out', 'up',
-            'down', 'into', 'over', 'under', 'again', 'after', 'before', 'team'
-        }
-        
-        # Combat-related keywords for context prioritization
-        self.combat_keywords = {
-            'attack', 'strike', 'hit', 'swing', 'fire', 'shoot', 'block', 'defend',
-            'damage', 'hurt', 'wound', 'fight', 'combat', 'battle', 'guard'
-        }
-        
-        # Item type priorities for different contexts
-        self.context_priorities = {
-            'combat': ['weapon', 'armor', 'shield', 'consumable'],
-            'general': ['equipment', 'consumable', 'misc', 'tool']
-        }
+        # Cleaned name tokens per item name - the inventory is rebuilt from the
+        # character files on every call, but the item names rarely change
+        self.item_token_cache = {}
+        
+        # Importance only depends on the word itself, so remember it per word
+        self.word_importance_cache = {}
 
     def clean_word(self, word: str) -> str:
         """Clean and normalize a word for matching"""
         # Remove non-alphanumeric characters and lowercase
-        return re.sub(r'[^a-z0-9]', '', word.lower())
+        return _clean_word(word)
 
     def fuzzy_match(self, word1: str, word2: str) -> float:
         """Calculate similarity between two words"""
         return SequenceMatcher(None, word1.lower(), word2.lower()).ratio()
 
+    def could_fuzzy_match(self, word1: str, word2: str) -> bool:
+        """Cheap upper bounds on fuzzy_match - False means it cannot reach the threshold"""
+        total = len(word1) + len(word2)
+        # ratio() is 2*M/T and M can never exceed the shorter word
+        if not total or 2.0 * min(len(word1), len(word2)) / total < self.similarity_threshold:
+            return False
+        # ...nor their longest common subsequence (rapidfuzz's Indel ratio is
+        # 2*LCS/T, computed in C) or, without rapidfuzz, their shared characters
+        if RAPIDFUZZ_AVAILABLE:
+            return fuzz.ratio(word1, word2) >= self.similarity_threshold * 100 - 1e-9
+        common = sum((Counter(word1) & Counter(word2)).values())
+        return 2.0 * common / total >= self.similarity_threshold
+
+    def get_item_tokens(self, item: Dict) -> Tuple[str, ...]:
+        """Return the cleaned words of an item's name, tokenizing each name only once"""
+        name = item.get('name', '')
+        tokens = self.item_token_cache.get(name)
+        if tokens is None:
+            if len(self.item_token_cache) >= self.ITEM_TOKEN_CACHE_MAX:
+                self.item_token_cache.clear()
+            tokens = tuple(self.clean_word(word) for word in _tokenize(name.lower()))
+            self.item_token_cache[name] = tokens
+        return tokens
+
     def calculate_word_importance(self, word: str) -> float:
         """Calculate importance of a word based on various factors"""
+        importance = self.word_importance_cache.get(word)
+        if importance is None:
+            if len(self.word_importance_cache) >= self.WORD_IMPORTANCE_CACHE_MAX:
+                self.word_importance_cache.clear()
+            importance = self._score_word_importance(word)
+            self.word_importance_cache[word] = importance
+        return importance
+
+    def _score_word_importance(self, word: str) -> float:
+        """Uncached importance calculation behind calculate_word_importance"""
         clean = self.clean_word(word)
         
         # Skip stop words entirely
-        if clean in self.stop_words:
+        if clean in self.STOP_WORDS:
             return 0.0
         
         # Short words are less important (but not ignored if not stop words)
@@ -65,7 +141,7 @@ class InventoryContextMatcherV2:
         base_importance = min(1.0, 0.6 + (len(clean) - 4) * 0.1)
         
         # Combat words get a boost in combat context
-        if clean in self.combat_keywords:
+        if clean in self.COMBAT_KEYWORDS:
             base_importance *= 1.2
             
         return min(1.0, base_importance)
@@ -88,10 +164,11 @@ class InventoryContextMatcherV2:
         if item_clean.endswith('s') and item_clean[:-1] == text_clean:
             return (0.95, 'plural')
         
-        # Fuzzy match
-        fuzzy_score = self.fuzzy_match(text_clean, item_clean)
-        if fuzzy_score >= self.similarity_threshold:
-            return (fuzzy_score, 'fuzzy')
+        # Fuzzy match (only run SequenceMatcher when the bounds allow a hit)
+        if self.could_fuzzy_match(text_clean, item_clean):
+            fuzzy_score = self.fuzzy_match(text_clean, item_clean)
+            if fuzzy_score >= self.similarity_threshold:
+                return (fuzzy_score, 'fuzzy')
         
         # Substring match for compound words (e.g., "sword" in "longsword")
         if len(text_clean) >= 4 and len(item_clean) > len(text_clean):
@@ -103,32 +180,54 @@ class InventoryContextMatcherV2:
         
         return (0.0, 'none')
 
-    def calculate_item_score(self, text: str, item: Dict, context: str) -> float:
-        """Calculate overall matching score for an item"""
-        text_words = re.findall(r'\b\w+\b', text.lower())
-        item_name = item.get('name', '').lower()
-        item_words = re.findall(r'\b\w+\b', item_name)
-        
-        # Keep action words like "use", "check", "take" but filter true stop words
-        significant_text_words = [
-            (word, self.calculate_word_importance(word))
-            for word in text_words
-            if self.calculate_word_importance(word) > 0.2  # Allow low-importance words
-        ]
+    def get_significant_words(self, text: str) -> List[Tuple[str, float]]:
+        """Tokenize player text into (word, importance) pairs - once per utterance"""
+        significant_text_words = []
+        for word in _tokenize(text.lower()):
+            importance = self.calculate_word_importance(word)
+            # Keep action words like "use", "check", "take" but filter true stop words
+            if importance > 0.2:  # Allow low-importance words
+                significant_text_words.append((word, importance))
+        return significant_text_words
+
+    def calculate_item_score(self, significant_text_words: List[Tuple[str, float]], item: Dict, context: str,
+                             word_matches: Dict = None) -> Tuple[float, List[Tuple[str, str, float]]]:
+        """
+        Calculate overall matching score for an item against pre-weighted text words
+        Returns: (score, match_details) - the item itself is never modified
+        """
+        item_words = self.get_item_tokens(item)
         
         if not significant_text_words:
-            return 0.0
+            return (0.0, [])
+        
+        # Match each distinct item word against the utterance only once - callers
+        # scoring a whole inventory share word_matches between items. Words that
+        # hit nothing are stored as None so they can be skipped outright.
+        if word_matches is None:
+            word_matches = {}
+        item_rows = []
+        for item_word in item_words:
+            if item_word not in word_matches:
+                row = [self.match_words(text_word, item_word) for text_word, _ in significant_text_words]
+                word_matches[item_word] = row if any(score for score, _ in row) else None
+            if word_matches[item_word] is not None:
+                item_rows.append(word_matches[item_word])
+        
+        # Most items share nothing with the utterance
+        if not item_rows:
+            return (0.0, [])
         
         # Track best matches for each text word
         word_scores = []
         match_details = []
         
-        for text_word, text_importance in significant_text_words:
+        for index, (text_word, text_importance) in enumerate(significant_text_words):
             best_score = 0.0
             best_match_type = 'none'
             
-            for item_word in item_words:
-                score, match_type = self.match_words(text_word, item_word)
+            for row in item_rows:
+                score, match_type = row[index]
                 if score > best_score:
                     best_score = score
                     best_match_type = match_type
@@ -140,50 +239,49 @@ class InventoryContextMatcherV2:
                 match_details.append((text_word, best_match_type, weighted_score))
         
         if not word_scores:
-            return 0.0
+            return (0.0, [])
         
         # Calculate final score
-        # Use best match if at least one good match exists
-        if word_scores:
-            # Use max score if we have at least one strong match
-            base_score = max(word_scores) if max(word_scores) > 0.7 else sum(word_scores) / len(word_scores)
-            match_count_bonus = min(0.2, len(word_scores) * 0.05)
-        else:
-            base_score = 0.0
-            match_count_bonus = 0.0
+        # Use max score if we have at least one strong match (word_scores is non-empty here)
+        strongest = max(word_scores)
+        base_score = strongest if strongest > 0.7 else sum(word_scores) / len(word_scores)
+        match_count_bonus = min(0.2, len(word_scores) * 0.05)
         
         # Context-based boost
         context_boost = 0.0
         item_type = item.get('type', '').lower()
-        if context == 'combat' and item_type in ['weapon', 'armor', 'shield']:
+        if context == 'combat' and item_type in self.COMBAT_ITEM_TYPES:
             context_boost = 0.1
-        elif context == 'general' and item_type in ['equipment', 'consumable', 'tool']:
+        elif context == 'general' and item_type in self.GENERAL_ITEM_TYPES:
             context_boost = 0.05
         
         total_score = base_score + match_count_bonus + context_boost
         
-        # Store match details for debugging (optional)
-        item['_match_details'] = match_details
-        item['_match_score'] = total_score
-        
-        return min(1.0, total_score)
+        return (min(1.0, total_score), match_details)
 
-    def find_matches_in_text(self, text: str, inventory: List[Dict], context: str = 'general') -> List[Dict]:
-        """Find inventory items mentioned in text using improved matching"""
+    def find_matches_with_details(self, text: str, inventory: List[Dict],
+                                  context: str = 'general') -> List[Tuple[Dict, float, List[Tuple[str, str, float]]]]:
+        """Find inventory items mentioned in text, returning (item, score, match_details) for the top matches"""
         matched_items = []
+        significant_text_words = self.get_significant_words(text)
+        word_matches = {}
         
         for item in inventory:
-            score = self.calculate_item_score(text, item, context)
+            score, match_details = self.calculate_item_score(significant_text_words, item, context, word_matches)
             
             # Only include items with significant matches
             if score >= self.similarity_threshold:
-                matched_items.append((item.copy(), score))
+                matched_items.append((item, score, match_details))
         
         # Sort by score and limit to max_matches
         matched_items.sort(key=lambda x: x[1], reverse=True)
         
         # Return only the top matches
-        return [item for item, score in matched_items[:self.max_matches]]
+        return matched_items[:self.max_matches]
+
+    def find_matches_in_text(self, text: str, inventory: List[Dict], context: str = 'general') -> List[Dict]:
+        """Find inventory items mentioned in text using improved matching"""
+        return [item for item, score, match_details in self.find_matches_with_details(text, inventory, context)]
 
     def format_item_description(self, item: Dict, context: str = 'general') -> str:
         """Format single item description based on context - no truncation"""
@@ -230,10 +328,6 @@ class InventoryContextMatcherV2:
         if matched_items:
             descriptions = []
             for item in matched_items:
-                # Clean up debug fields before formatting
-                item.pop('_match_details', None)
-                item.pop('_match_score', None)
-                
                 # Format: "ItemName - Description with stats"
                 name = item.get('name', 'Unknown')
                 parts = []
@@ -19,6 +19,18 @@ class LLMClient(ABC):
     def chat_completion(self, model, messages, temperature=0.7, **kwargs):
         pass
 
+    def chat_completion_stream(self, model, messages, temperature=0.7, usage=None, **kwargs):
+        """
+        Yield response text as it arrives. Clients without streaming yield the whole reply once.
+        
+        If a usage dict is passed, it is filled with the token counts once the stream
+        finishes, for providers that report them.
+        """
+        response = self.chat_completion(model, messages, temperature, **kwargs)
+        if usage is not None and getattr(response, 'usage', None) is not None:
+            usage.update(response.usage.model_dump())
+        yield response.choices[0].message.content
+
 class OpenAIClient(LLMClient):
     def __init__(self):
         # Use LLM_API_KEY if available, fallback to OPENAI_API_KEY for backwards compatibility
@@ -37,14 +49,64 @@ class OpenAIClient(LLMClient):
             **kwargs
         )
 
+    def chat_completion_stream(self, model, messages, temperature=0.7, usage=None, **kwargs):
+        if usage is not None:
+            # Token counts arrive in a final chunk only when asked for
+            kwargs.setdefault('stream_options', {"include_usage": True})
+        stream = self.client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            stream=True,
+            **kwargs
+        )
+        try:
+            for chunk in stream:
+                if usage is not None and getattr(chunk, 'usage', None) is not None:
+                    usage.update(chunk.usage.model_dump())
+                # A trailing usage chunk has no choices, and role/stop deltas have no content
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            # Release the connection if the caller stops reading early
+            stream.response.close()
+
 class GeminiClient(LLMClient):
+    # System prompts can embed live game state, so keep the model cache bounded
+    MODEL_CACHE_MAX = 32
+
+    # Configure safety settings to be less restrictive
+    SAFETY_SETTINGS = [
+        {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_NONE"},
+        {"category": "HARM_CATEGORY_HATE_SPEECH", "threshold": "BLOCK_NONE"},
+        {"category": "HARM_CATEGORY_SEXUALLY_EXPLICIT", "threshold": "BLOCK_NONE"},
+        {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_NONE"},
+    ]
+
     def __init__(self):
         genai.configure(api_key=config.GEMINI_API_KEY)
         # Create nested structure to mimic OpenAI interface
         self.chat = GeminiChatNamespace(self)
+        # GenerativeModel instances keyed by (model, system_instruction)
+        self._model_cache = {}
 
-    def chat_completion(self, model, messages, temperature=0.7, **kwargs):
-        # Map OpenAI messages to Gemini format
+    def _get_model(self, model, system_instruction, safety_settings):
+        """Reuse the GenerativeModel for a model/system prompt pair instead of rebuilding it per request"""
+        key = (model, system_instruction)
+        model_instance = self._model_cache.get(key)
+        if model_instance is None:
+            if len(self._model_cache) >= self.MODEL_CACHE_MAX:
+                self._model_cache.clear()
+            model_instance = genai.GenerativeModel(
+                model_name=model, 
+                system_instruction=system_instruction,
+                safety_settings=safety_settings
+            )
+            self._model_cache[key] = model_instance
+        return model_instance
+
+    def _to_gemini_messages(self, messages):
+        """Map OpenAI-style messages to Gemini contents plus a system instruction"""
         gemini_messages = []
         system_instruction = None
         
@@ -62,24 +124,18 @@ class GeminiClient(LLMClient):
         if not gemini_messages:
             gemini_messages = [{"role": "user", "parts": ["Hello"]}]
 
+        return gemini_messages, system_instruction
+
+    def chat_completion(self, model, messages, temperature=0.7, **kwargs):
+        # Map OpenAI messages to Gemini format
+        gemini_messages, system_instruction = self._to_gemini_messages(messages)
+
         generation_config = {
             "temperature": temperature,
         }
         
-        # Configure safety settings to be less restrictive
-        safety_settings = [
-            {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_NONE"},
-            {"category": "HARM_CATEGORY_HATE_SPEECH", "threshold": "BLOCK_NONE"},
-            {"category": "HARM_CATEGORY_SEXUALLY_EXPLICIT", "threshold": "BLOCK_NONE"},
-            {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_NONE"},
-        ]
-        
         try:
-            model_instance = genai.GenerativeModel(
-                model_name=model, 
-                system_instruction=system_instruction,
-                safety_settings=safety_settings
-            )
+            model_instance = self._get_model(model, system_instruction, self.SAFETY_SETTINGS)
             
             response = model_instance.generate_content(
                 gemini_messages,
@@ -133,6 +189,27 @@ class GeminiClient(LLMClient):
         # Wrap response to mimic OpenAI response structure for compatibility
         return GeminiResponseWrapper(response)
 
+    def chat_completion_stream(self, model, messages, temperature=0.7, usage=None, **kwargs):
+        gemini_messages, system_instruction = self._to_gemini_messages(messages)
+        model_instance = self._get_model(model, system_instruction, self.SAFETY_SETTINGS)
+        try:
+            response = model_instance.generate_content(
+                gemini_messages,
+                generation_config={"temperature": temperature},
+                stream=True
+            )
+            for chunk in response:
+                # Chunks carrying only safety/finish metadata raise on .text
+                try:
+                    text = chunk.text
+                except ValueError:
+                    continue
+                if text:
+                    yield text
+        except Exception as e:
+            error(f"Gemini API error: {e}")
+            raise
+
 class GeminiChatNamespace:
     """Mimics OpenAI's client.chat namespace"""
     def __init__(self, parent_client):
@@ -190,6 +267,18 @@ class OllamaClient(LLMClient):
         # Wrap response to mimic OpenAI response structure
         return OllamaResponseWrapper(response)
 
+    def chat_completion_stream(self, model, messages, temperature=0.7, usage=None, **kwargs):
+        stream = self.client.chat(
+            model=model,
+            messages=messages,
+            options={'temperature': temperature},
+            stream=True
+        )
+        for chunk in stream:
+            content = chunk['message']['content']
+            if content:
+                yield content
+
 class OllamaChatNamespace:
     """Mimics OpenAI's client.chat namespace"""
     def __init__(self, parent_client):
@@ -216,12 +305,32 @@ class OllamaMessage:
     def __init__(self, response):
         self.content = response['message']['content']
 
+# One client per provider for the life of the process. Each OpenAI/Ollama client
+# owns an httpx connection pool, so reusing it keeps connections (and TLS
+# sessions) alive instead of reconnecting for every caller. Entries are
+# (settings, client); a client is rebuilt when its key or endpoint changes.
+_CLIENTS = {}
+
+def _client_settings(provider):
+    """The config values a provider's client is built from"""
+    if provider == 'gemini':
+        return getattr(config, 'GEMINI_API_KEY', None)
+    if provider == 'ollama':
+        return getattr(config, 'OLLAMA_BASE_URL', 'http://localhost:11434')
+    return getattr(config, 'LLM_API_KEY', None) or getattr(config, 'OPENAI_API_KEY', None)
+
 def get_llm_client():
     provider = getattr(config, 'LLM_PROVIDER', 'openai').lower()
+    settings = _client_settings(provider)
     
+    cached = _CLIENTS.get(provider)
+    if cached is not None and cached[0] == settings:
+        return cached[1]
     if provider == 'gemini':
-        return GeminiClient()
+        client = GeminiClient()
     elif provider == 'ollama':
-        return OllamaClient()
+        client = OllamaClient()
     else:
-        return OpenAIClient()
+        client = OpenAIClient()
+    _CLIENTS[provider] = (settings, client)
+    return client
@@ -8,11 +8,40 @@ Purpose: Provide lightweight, exploration-focused atlas for validating travel re
 """
 
 import os
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Tuple
 from utils.file_operations import safe_read_json
 from utils.module_path_manager import ModulePathManager
 from utils.enhanced_logger import debug
 
+# Recently built atlases, oldest first: (module_name, graph state, area-file fingerprint, atlas)
+_ATLAS_CACHE: List[Tuple[str, tuple, tuple, str]] = []
+_ATLAS_CACHE_MAX = 8
+
+
+def _graph_state(location_graph) -> tuple:
+    """The graph containers an atlas was built from (LocationGraph.reload replaces them)"""
+    return (location_graph.nodes, location_graph.edges, location_graph.area_data,
+            len(location_graph.nodes), len(location_graph.edges))
+
+
+def _same_graph_state(state_a: tuple, state_b: tuple) -> bool:
+    """Containers are compared by identity, their sizes by value"""
+    return all(a is b for a, b in zip(state_a[:3], state_b[:3])) and state_a[3:] == state_b[3:]
+
+
+def _area_files_fingerprint(location_graph, path_manager) -> tuple:
+    """(path, mtime_ns, size) of every area file the atlas reads; missing files stat as None"""
+    area_ids = sorted({node.get('area_id') for node in location_graph.nodes.values() if node.get('area_id')})
+    fingerprint = []
+    for area_id in area_ids:
+        area_file = path_manager.get_area_path(area_id)
+        try:
+            stat = os.stat(area_file)
+            fingerprint.append((area_file, stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            fingerprint.append((area_file, None, None))
+    return tuple(fingerprint)
+
 
 def build_transition_atlas(location_graph, module_name: str) -> str:
     """
@@ -33,11 +62,21 @@ def build_transition_atlas(location_graph, module_name: str) -> str:
     Note:
         Visited status determined by checking encounters array.
         Empty encounters = unexplored, Has encounters = visited.
+        The atlas is cached and rebuilt only when the graph is reloaded or
+        an area file changes on disk.
     """
-    debug(f"Building transition atlas for {module_name}", category="transition_atlas")
-
     path_manager = ModulePathManager(module_name)
 
+    graph_state = _graph_state(location_graph)
+    fingerprint = _area_files_fingerprint(location_graph, path_manager)
+    for cached_module, cached_state, cached_fingerprint, cached_atlas in _ATLAS_CACHE:
+        if (cached_module == module_name and cached_fingerprint == fingerprint
+                and _same_graph_state(cached_state, graph_state)):
+            debug(f"Reusing cached transition atlas for {module_name}", category="transition_atlas")
+            return cached_atlas
+
+    debug(f"Building transition atlas for {module_name}", category="transition_atlas")
+
     lines = []
     lines.append("=== EXPLORATION-AWARE ATLAS ===")
     lines.append(f"Module: {module_name}")
@@ -45,6 +84,8 @@ def build_transition_atlas(location_graph, module_name: str) -> str:
 
     # Group locations by area
     areas_data = {}
+    # Area files indexed by locationId - each file is read once, not once per location
+    area_location_index = {}
     for loc_id, node_info in location_graph.nodes.items():
         area_id = node_info.get('area_id')
         if not area_id:
@@ -61,28 +102,34 @@ def build_transition_atlas(location_graph, module_name: str) -> str:
             }
 
         # Load area file to check for monsters/encounters
-        area_file = path_manager.get_area_path(area_id)
+        if area_id not in area_location_index:
+            locations_by_id = {}
+            area_file = path_manager.get_area_path(area_id)
+            if os.path.exists(area_file):
+                area_json = safe_read_json(area_file)
+                if area_json:
+                    for location in area_json.get('locations', []):
+                        # Keep the first entry for an ID, as the old linear scan did
+                        locations_by_id.setdefault(location.get('locationId'), location)
+            area_location_index[area_id] = locations_by_id
+
         has_monsters = False
         has_encounter_entries = False
         monster_names = []
 
-        if os.path.exists(area_file):
-            area_json = safe_read_json(area_file)
-            if area_json:
-                for location in area_json.get('locations', []):
-                    if location.get('locationId') == loc_id:
-                        monsters = location.get('monsters', [])
-                        encounters = location.get('encounters', [])
-                        has_monsters = len(monsters) > 0
-
-                        # Check for GAMEPLAY encounters (have encounterId key)
-                        # Template encounters (type/description) don't count as visited
-                        has_encounter_entries = any(
-                            isinstance(e, dict) and 'encounterId' in e
-                            for e in encounters
-                        )
-                        monster_names = [m.get('name', 'Unknown') for m in monsters if isinstance(m, dict)]
-                        break
+        location = area_location_index[area_id].get(loc_id)
+        if location is not None:
+            monsters = location.get('monsters', [])
+            encounters = location.get('encounters', [])
+            has_monsters = len(monsters) > 0
+
+            # Check for GAMEPLAY encounters (have encounterId key)
+            # Template encounters (type/description) don't count as visited
+            has_encounter_entries = any(
+                isinstance(e, dict) and 'encounterId' in e
+                for e in encounters
+            )
+            monster_names = [m.get('name', 'Unknown') for m in monsters if isinstance(m, dict)]
 
         # Determine visited status
         # If encounters array has GAMEPLAY entries (with encounterId), location visited
@@ -103,11 +150,12 @@ def build_transition_atlas(location_graph, module_name: str) -> str:
         location_name = node_info.get('location_name', 'Unknown')
         loc_type = node_info.get('data', {}).get('type', 'unknown')
 
-        loc_line = f"{loc_id}: {location_name} ({loc_type}) {status_marker}"
+        # Collect the line in fragments and join once at the end
+        loc_parts = [f"{loc_id}: {location_name} ({loc_type}) {status_marker}"]
 
         # Add monster info for unexplored dangerous locations
         if not is_visited and monster_names:
-            loc_line += f" [Monsters: {', '.join(monster_names)}]"
+            loc_parts.append(f" [Monsters: {', '.join(monster_names)}]")
 
         # Add internal connections
         connectivity = location_graph.edges.get(loc_id, [])
@@ -118,7 +166,7 @@ def build_transition_atlas(location_graph, module_name: str) -> str:
                 if location_graph.nodes.get(conn_id, {}).get('area_id') == area_id
             ]
             if same_area_connections:
-                loc_line += f" -> [{', '.join(same_area_connections)}]"
+                loc_parts.append(f" -> [{', '.join(same_area_connections)}]")
 
         # Add area connections
         location_data = node_info.get('data', {})
@@ -126,9 +174,9 @@ def build_transition_atlas(location_graph, module_name: str) -> str:
         area_connectivity_ids = location_data.get('areaConnectivityId', [])
         if area_connectivity and area_connectivity_ids:
             for area_name, loc_id_target in zip(area_connectivity, area_connectivity_ids):
-                loc_line += f"\n      +--> To {area_name} ({loc_id_target})"
+                loc_parts.append(f"\n      +--> To {area_name} ({loc_id_target})")
 
-        areas_data[area_id]['locations'].append(loc_line)
+        areas_data[area_id]['locations'].append(''.join(loc_parts))
 
     # Format output by area
     for area_id in sorted(areas_data.keys()):
@@ -136,8 +184,7 @@ def build_transition_atlas(location_graph, module_name: str) -> str:
         lines.append(f"AREA {area_id}: {area['name']} ({area['type']})")
         lines.append(f"  Danger: {area['danger']}, Recommended Level: {area['level']}")
         lines.append("  Locations:")
-        for loc_line in area['locations']:
-            lines.append(f"    {loc_line}")
+        lines.extend(f"    {loc_line}" for loc_line in area['locations'])
         lines.append("")
 
     # Add legend
@@ -146,4 +193,10 @@ def build_transition_atlas(location_graph, module_name: str) -> str:
     lines.append("  [UNEXPLORED - SAFE] - Not visited, no monsters defined (safe passage)")
     lines.append("  [UNEXPLORED - HAS MONSTERS] - Not visited, has monsters defined (BLOCKS TRAVEL)")
 
-    return "\n".join(lines)
+    atlas = "\n".join(lines)
+
+    _ATLAS_CACHE.append((module_name, graph_state, fingerprint, atlas))
+    if len(_ATLAS_CACHE) > _ATLAS_CACHE_MAX:
+        del _ATLAS_CACHE[0]
+
+    return atlas
@@ -5,26 +5,147 @@ This module uses a specialized AI agent to evaluate whether travel requests
 are appropriate given exploration status, encounters, and plot progression.
 """
 
+import hashlib
 import json
 import os
+import re
+import threading
 from typing import Dict, List, Any, Optional
 from core.ai.llm_client import get_llm_client
 from config import LLM_API_KEY
 from model_config import TRANSITION_VALIDATOR_MODEL, TRANSITION_VALIDATOR_TEMPERATURE
+from utils.encoding_utils import fast_json_loads
 from utils.enhanced_logger import debug, info, warning, error
 from utils.file_operations import safe_read_json
 
-
 # Initialize OpenAI client
 client = get_llm_client()
 
+# System prompt text, read from disk on first successful load
+_validation_prompt = None
+
+# Structured output schema for providers that enforce it (OpenAI). The others
+# ignore response_format, so the parse/default handling below still applies.
+TRANSITION_DECISION_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "transition_decision",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "approved": {"type": "boolean"},
+                "stop_location": {"type": ["string", "null"]},
+                "stop_location_name": {"type": ["string", "null"]},
+                "reason": {"type": "string"},
+                "narrative_guidance": {"type": "string"},
+                "requires_encounter": {"type": "boolean"},
+                "plot_guidance": {"type": ["string", "null"]}
+            },
+            "required": [
+                "approved", "stop_location", "stop_location_name", "reason",
+                "narrative_guidance", "requires_encounter", "plot_guidance"
+            ],
+            "additionalProperties": False
+        }
+    }
+}
+
+# Parsed decisions keyed by a digest of the exact request sent, so a retried
+# request against unchanged game state skips the API round trip
+DECISION_CACHE_MAX = 256
+_decision_cache = {}
+
+
+# Top-level keys of a streamed decision. Quotes inside JSON string values are
+# escaped, so these can't match text the model wrote inside another field.
+_APPROVED_RE = re.compile(r'"approved"\s*:\s*(true|false)')
+_REASON_KEY_RE = re.compile(r'"reason"\s*:\s*')
+_json_decoder = json.JSONDecoder()
+
+
+def _early_approval(partial_text: str) -> Optional[Dict[str, Any]]:
+    """
+    Return the decision as soon as a partial reply approves the transition and has its reason.
+
+    An approved transition only needs its reason downstream, so the narrative and
+    plot guidance that follow can be skipped instead of waiting for them to generate.
+    """
+    approved = _APPROVED_RE.search(partial_text)
+    if not approved or approved.group(1) != "true":
+        return None
+    reason_key = _REASON_KEY_RE.search(partial_text)
+    if not reason_key:
+        return None
+    try:
+        reason, _ = _json_decoder.raw_decode(partial_text, reason_key.end())
+    except ValueError:
+        # Reason is still streaming in
+        return None
+    return {"approved": True, "reason": reason}
+
+
+def _strip_code_fence(text: str) -> str:
+    """Remove a markdown code block around a reply, as GeminiMessage does for non-streamed replies"""
+    if text.startswith('```'):
+        lines = text.split('\n')
+        if lines[0].startswith('```'):
+            lines = lines[1:]
+        if lines and lines[-1].strip() == '```':
+            lines = lines[:-1]
+        text = '\n'.join(lines)
+    return text
+
+
+def _log_validator_call(messages: List[Dict[str, str]], response_text: str, usage: Optional[Dict]) -> None:
+    """Record a validator call with the API logger"""
+    try:
+        from utils.api_logger import log_api_call
+        log_api_call(
+            call_type="transition_agent",
+            model=TRANSITION_VALIDATOR_MODEL,
+            request_data={
+                "messages": messages,
+                "temperature": TRANSITION_VALIDATOR_TEMPERATURE,
+                "response_format": TRANSITION_DECISION_FORMAT
+            },
+            response_content=response_text,
+            usage=usage or None
+        )
+    except Exception as e:
+        debug(f"Failed to log transition agent API call: {e}", category="transition_validation")
+
+
+def _finish_and_log(stream, messages: List[Dict[str, str]], response_text: str, usage: Dict) -> None:
+    """Read the rest of an early-approved reply, then log the call with its full text and token usage"""
+    try:
+        for piece in stream:
+            response_text += piece
+    except Exception as e:
+        debug(f"Transition validator stream ended with error: {e}", category="transition_validation")
+    _log_validator_call(messages, response_text, usage)
+
+
+def _decision_cache_key(messages: List[Dict[str, str]]) -> str:
+    """Digest of everything that determines the validator's answer"""
+    payload = json.dumps(
+        [TRANSITION_VALIDATOR_MODEL, TRANSITION_VALIDATOR_TEMPERATURE, messages],
+        ensure_ascii=False
+    )
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
 
 def load_transition_validation_prompt() -> str:
-    """Load the transition validation system prompt"""
+    """Load the transition validation system prompt (cached after the first successful read)"""
+    global _validation_prompt
+    if _validation_prompt is not None:
+        return _validation_prompt
+
     prompt_path = "prompts/transition_validation_prompt.txt"
     try:
         with open(prompt_path, 'r', encoding='utf-8') as f:
-            return f.read()
+            _validation_prompt = f.read()
+        return _validation_prompt
     except Exception as e:
         error(f"Failed to load transition validation prompt: {e}", category="transition_validation")
         return ""
@@ -112,7 +233,17 @@ def validate_transition_request(
     # Build compact plot summary
     plot_summary = _build_plot_summary(plot_data)
 
-    # Construct user message with all context
+    # Module context that only changes with exploration/plot progress. It goes
+    # first, right after the system prompt, so consecutive validations share a
+    # byte-identical prefix the provider can serve from its prompt cache.
+    module_context = f"""TRANSITION ATLAS:
+{transition_atlas.rstrip()}
+
+PLOT PROGRESSION:
+{plot_summary}
+"""
+
+    # Construct user message with the request-specific context
     user_message = f"""TRAVEL REQUEST VALIDATION
 
 PLAYER REQUEST:
@@ -133,58 +264,66 @@ CALCULATED PATH:
 
 {path_context}
 
-TRANSITION ATLAS:
-{transition_atlas}
-
-PLOT PROGRESSION:
-{plot_summary}
-
 DECISION REQUIRED:
 Evaluate if this travel request should be approved or if the party must stop
 at an intermediate location due to unexplored encounters. Respond with JSON only.
 """
 
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": module_context},
+        {"role": "user", "content": user_message}
+    ]
+
+    cache_key = _decision_cache_key(messages)
+    cached = _decision_cache.get(cache_key)
+    if cached is not None:
+        debug(f"Reusing cached transition decision: {current_location_id} -> {target_location_id}", category="transition_validation")
+        return dict(cached)
+
     try:
         # Call AI agent
         debug("Sending request to transition validator AI", category="transition_validation")
 
-        response = client.chat.completions.create(
-            model=TRANSITION_VALIDATOR_MODEL,
-            temperature=TRANSITION_VALIDATOR_TEMPERATURE,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_message}
-            ]
+        # Stream the reply so an approval can be acted on without waiting for
+        # the narrative fields; blocked transitions read the whole reply
+        response_text = ""
+        early_result = None
+        usage = {}
+        stream = client.chat_completion_stream(
+            TRANSITION_VALIDATOR_MODEL,
+            messages,
+            TRANSITION_VALIDATOR_TEMPERATURE,
+            usage=usage,
+            response_format=TRANSITION_DECISION_FORMAT
         )
-
-        # Log API call
-        try:
-            from utils.api_logger import log_api_call
-            log_api_call(
-                call_type="transition_agent",
-                model=TRANSITION_VALIDATOR_MODEL,
-                request_data={
-                    "messages": [
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_message}
-                    ],
-                    "temperature": TRANSITION_VALIDATOR_TEMPERATURE
-                },
-                response_content=response.choices[0].message.content,
-                usage=response.usage.model_dump() if hasattr(response, 'usage') else None
-            )
-        except Exception as e:
-            debug(f"Failed to log transition agent API call: {e}", category="transition_validation")
+        for piece in stream:
+            response_text += piece
+            early_result = _early_approval(response_text)
+            if early_result is not None:
+                break
+
+        # Log API call. Token usage only arrives at the end of the stream, so an
+        # early approval leaves the rest to a background thread and returns now.
+        if early_result is not None:
+            threading.Thread(
+                target=_finish_and_log,
+                args=(stream, messages, response_text, usage),
+                daemon=True
+            ).start()
+        else:
+            _log_validator_call(messages, response_text, usage)
 
         # Parse response
-        response_text = response.choices[0].message.content.strip()
+        response_text = _strip_code_fence(response_text)
         debug(f"Transition validator response: {response_text[:200]}...", category="transition_validation")
 
-        # Parse JSON response
-        result = json.loads(response_text)
+        # Parse JSON response (an early approval already has what it needs)
+        result = early_result if early_result is not None else fast_json_loads(response_text)
 
         # Validate response structure
-        if "approved" not in result:
+        has_decision = "approved" in result
+        if not has_decision:
             warning("Transition validator returned invalid JSON (missing 'approved')", category="transition_validation")
             result["approved"] = True  # Default to approve on error
 
@@ -203,6 +342,13 @@ at an intermediate location due to unexplored encounters. Respond with JSON only
             info(f"Transition blocked: Must stop at {result['stop_location']}", category="transition_validation")
             debug(f"Block reason: {result['reason']}", category="transition_validation")
 
+        # Only real decisions are cached - defaulted approvals and the
+        # fallbacks below retry next time
+        if has_decision:
+            if len(_decision_cache) >= DECISION_CACHE_MAX:
+                _decision_cache.clear()
+            _decision_cache[cache_key] = dict(result)
+
         return result
 
     except json.JSONDecodeError as e:
@@ -233,21 +379,23 @@ at an intermediate location due to unexplored encounters. Respond with JSON only
         }
 
 
+# Plot point status -> summary marker (any other status reads as completed)
+_STATUS_MARKERS = {
+    "in progress": "[IN PROGRESS]",
+    "not started": "[NOT STARTED]",
+}
+
+
 def _build_plot_summary(plot_data: Dict) -> str:
     """Build compact plot summary for AI context"""
     if not plot_data:
         return "No plot data available"
 
     lines = ["Plot Points:"]
-
-    for pp in plot_data.get("plotPoints", []):
-        pp_id = pp.get("id", "Unknown")
-        title = pp.get("title", "Untitled")
-        status = pp.get("status", "unknown")
-        location = pp.get("location", "Unknown")
-
-        status_marker = "[IN PROGRESS]" if status == "in progress" else "[NOT STARTED]" if status == "not started" else "[COMPLETED]"
-
-        lines.append(f"  {pp_id}: {title} ({location}) {status_marker}")
+    lines.extend(
+        f"  {pp.get('id', 'Unknown')}: {pp.get('title', 'Untitled')} ({pp.get('location', 'Unknown')}) "
+        f"{_STATUS_MARKERS.get(pp.get('status'), '[COMPLETED]')}"
+        for pp in plot_data.get("plotPoints", [])
+    )
 
     return "\n".join(lines)
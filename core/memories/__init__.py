@@ -4,7 +4,7 @@ A deterministic memory system for companion NPCs based on emotional physics.
 """
 
 from .emotional_vectors import EmotionalVector, EmotionalDimensions
-from .action_parser import ActionParser
+from .action_parser import ActionParser, DEFAULT_PARSER
 from .memory_crystallizer import MemoryCrystallizer
 from .memory_gravity import MemoryGravity
 from .companion_memory import CompanionMemoryManager
@@ -13,6 +13,7 @@ __all__ = [
     'EmotionalVector',
     'EmotionalDimensions',
     'ActionParser',
+    'DEFAULT_PARSER',
     'MemoryCrystallizer',
     'MemoryGravity',
     'CompanionMemoryManager'
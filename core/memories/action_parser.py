@@ -7,6 +7,7 @@ Extracts emotionally significant actions from journal entries.
 import re
 from typing import Dict, List, Tuple, Optional
 from dataclasses import dataclass
+from types import MappingProxyType
 
 # Action patterns that trigger emotional changes
 # Based on actual journal content analysis
@@ -172,9 +173,219 @@ NEGATIVE_PATTERNS = {
     r'(?:intimidated|frightened|scared)': {'fear': 0.5, 'trust': -0.3},
 }
 
+def _required_literal(pattern: str, min_length: int = 4) -> Optional[str]:
+    """Longest run of plain top-level characters that every match must contain, or None"""
+    runs = []
+    run = ''
+    depth = 0
+    i = 0
+    while i < len(pattern):
+        ch = pattern[i]
+        if ch == '\\':
+            # Escapes (\s etc.) are not literal text - skip the escaped character too
+            runs.append(run)
+            run = ''
+            i += 2
+            continue
+        if ch == '[':
+            # Character classes match one of several characters - skip the whole class
+            runs.append(run)
+            run = ''
+            i = pattern.index(']', i + 2) + 1
+            continue
+        if ch == '(':
+            depth += 1
+        elif ch == ')':
+            depth -= 1
+        elif depth == 0 and ch == '|':
+            # Top-level alternation - no single literal is required
+            return None
+        is_plain = depth == 0 and (ch.isalnum() or ch in " -'")
+        is_optional = i + 1 < len(pattern) and pattern[i + 1] in '?*{'
+        if is_plain and not is_optional:
+            run += ch
+        else:
+            runs.append(run)
+            run = ''
+        i += 1
+    runs.append(run)
+    longest = max(runs, key=len)
+    return longest if len(longest) >= min_length else None
+
+def _compile_patterns(patterns: Dict[str, Dict[str, float]]) -> List[Tuple[str, re.Pattern, Dict[str, float], Optional[str]]]:
+    """Compile a pattern table once into (pattern, regex, emotional impact, anchor) rules
+
+    The impact is a read-only view shared by every ParsedAction for that pattern.
+    """
+    return [(pattern, re.compile(pattern), MappingProxyType(impact), _required_literal(pattern))
+            for pattern, impact in patterns.items()]
+
+# Compiled at import so parsing never goes through re's pattern cache.
+# The anchor is a literal every match contains - when it is missing from the
+# text (a plain substring test), the regex cannot match and is skipped.
+POSITIVE_RULES = _compile_patterns(ACTION_PATTERNS)
+NEGATIVE_RULES = _compile_patterns(NEGATIVE_PATTERNS)
+
+# Names that are plain text (no regex syntax), so they can share one scan
+_LITERAL_NAME_RE = re.compile(r"[A-Za-z0-9]+(?:[ '-][A-Za-z0-9]+)*")
+
+EMOTIONS = ('trust', 'power', 'intimacy', 'fear', 'respect')
+
+def _impact_vector(impact) -> Tuple[float, ...]:
+    """Lay an impact mapping out in EMOTIONS order, missing emotions as 0.0"""
+    return tuple(impact.get(emotion, 0.0) for emotion in EMOTIONS)
+
+# Fixed-order impact per shared rule impact, keyed by the mapping's identity
+IMPACT_VECTORS = {id(impact): _impact_vector(impact) for _, _, impact, _ in POSITIVE_RULES + NEGATIVE_RULES}
+
+def _readable_label(pattern: str) -> str:
+    """Convert a pattern to a readable action description"""
+    # Extract key words from pattern for readable output
+
+    # Healing and support
+    if 'cure' in pattern or 'heal' in pattern:
+        return 'cast healing magic'
+    elif 'sacred' in pattern:
+        return 'used divine power'
+    elif 'support' in pattern:
+        return 'offered support'
+    elif 'reassurance' in pattern:
+        return 'offered reassurance'
+    elif 'comforted' in pattern or 'consoled' in pattern:
+        return 'provided comfort'
+
+    # Romantic/Intimate
+    elif 'passionate' in pattern and 'kiss' in pattern:
+        return 'shared passionate kiss'
+    elif 'kiss' in pattern:
+        return 'shared kiss'
+    elif 'embrace' in pattern:
+        return 'embraced warmly'
+    elif 'dance' in pattern:
+        return 'danced together'
+    elif 'whisper' in pattern:
+        return 'whispered softly'
+    elif 'affection' in pattern:
+        return 'showed affection'
+    elif 'romantic' in pattern:
+        return 'romantic moment'
+
+    # Combat
+    elif 'critical' in pattern or 'devastating' in pattern:
+        return 'critical strike'
+    elif 'heroically' in pattern or 'bravely' in pattern:
+        return 'heroic charge'
+    elif 'dodged' in pattern or 'parried' in pattern:
+        return 'expert defense'
+    elif 'flanked' in pattern or 'outmaneuvered' in pattern:
+        return 'tactical maneuver'
+    elif 'coordinated' in pattern or 'synchronized' in pattern:
+        return 'coordinated attack'
+    elif 'last' in pattern and 'stand' in pattern:
+        return 'last stand'
+
+    # Social bonds
+    elif 'bond' in pattern:
+        return 'deepened bond'
+    elif 'trust' in pattern:
+        return 'built trust'
+    elif 'together' in pattern:
+        return 'worked together'
+    elif 'camaraderie' in pattern:
+        return 'shared camaraderie'
+    elif 'laugh' in pattern or 'joke' in pattern:
+        return 'shared laughter'
+    elif 'celebrated' in pattern or 'rejoiced' in pattern:
+        return 'celebrated together'
+    elif 'meal' in pattern:
+        return 'shared meal'
+
+    # Loyalty
+    elif 'oath' in pattern or 'pledged' in pattern:
+        return 'pledged oath'
+    elif 'loyalty' in pattern:
+        return 'proved loyalty'
+    elif 'refused' in pattern and 'abandon' in pattern:
+        return 'refused to abandon'
+    elif 'stood' in pattern and 'by' in pattern:
+        return 'stood by ally'
+
+    # Strategic
+    elif 'plan' in pattern or 'strategy' in pattern:
+        return 'devised strategy'
+    elif 'outsmarted' in pattern or 'outwitted' in pattern:
+        return 'outsmarted enemy'
+    elif 'trap' in pattern or 'ambush' in pattern:
+        return 'detected danger'
+    elif 'puzzle' in pattern or 'riddle' in pattern:
+        return 'solved puzzle'
+
+    # Vulnerability
+    elif 'revealed' in pattern and 'secret' in pattern:
+        return 'shared secret'
+    elif 'admitted' in pattern or 'confessed' in pattern:
+        return 'admitted vulnerability'
+    elif 'cried' in pattern or 'wept' in pattern:
+        return 'shared tears'
+    elif 'vulnerability' in pattern:
+        return 'showed vulnerability'
+
+    # Protection
+    elif 'watch' in pattern or 'keen' in pattern:
+        return 'kept watch'
+    elif 'protected' in pattern:
+        return 'provided protection'
+    elif 'risked' in pattern or 'sacrificed' in pattern:
+        return 'made sacrifice'
+    elif 'saved' in pattern or 'rescued' in pattern:
+        return 'performed rescue'
+
+    # Teaching
+    elif 'taught' in pattern or 'instructed' in pattern:
+        return 'taught skills'
+    elif 'mentored' in pattern or 'guided' in pattern:
+        return 'mentored ally'
+    elif 'wisdom' in pattern or 'knowledge' in pattern:
+        return 'shared wisdom'
+
+    # Competition
+    elif 'competition' in pattern or 'rivalry' in pattern:
+        return 'friendly rivalry'
+    elif 'challenged' in pattern or 'competed' in pattern:
+        return 'friendly challenge'
+
+    # Negative actions
+    elif 'fled' in pattern or 'abandoned' in pattern:
+        return 'abandoned in danger'
+    elif 'betrayed' in pattern:
+        return 'betrayed trust'
+    elif 'threatened' in pattern:
+        return 'made threats'
+    elif 'cruel' in pattern or 'callous' in pattern:
+        return 'showed cruelty'
+    elif 'lied' in pattern or 'deceived' in pattern:
+        return 'deceived ally'
+
+    # Resource sharing
+    elif 'generous' in pattern:
+        return 'showed generosity'
+
+    else:
+        # Fallback - extract main word from pattern
+        words = re.findall(r'\w+', pattern)
+        if words:
+            return ' '.join(words[-2:]) if len(words) > 1 else words[-1]
+        return 'interacted'
+
+# Readable label for every known pattern, worked out once at import
+PATTERN_LABELS = {pattern: _readable_label(pattern) for pattern in list(ACTION_PATTERNS) + list(NEGATIVE_PATTERNS)}
+
 @dataclass
 class ParsedAction:
     """Represents a parsed action from journal text"""
+    # No per-instance __dict__ - a long journal produces many of these
+    __slots__ = ('pattern', 'emotional_impact', 'context', 'npc_name', 'action_type')
+
     pattern: str
     emotional_impact: Dict[str, float]
     context: str
@@ -183,142 +394,10 @@ class ParsedAction:
     
     def get_readable_action(self) -> str:
         """Convert pattern to readable action description"""
-        # Extract key words from pattern for readable output
-
-        # Healing and support
-        if 'cure' in self.pattern or 'heal' in self.pattern:
-            return 'cast healing magic'
-        elif 'sacred' in self.pattern:
-            return 'used divine power'
-        elif 'support' in self.pattern:
-            return 'offered support'
-        elif 'reassurance' in self.pattern:
-            return 'offered reassurance'
-        elif 'comforted' in self.pattern or 'consoled' in self.pattern:
-            return 'provided comfort'
-
-        # Romantic/Intimate
-        elif 'passionate' in self.pattern and 'kiss' in self.pattern:
-            return 'shared passionate kiss'
-        elif 'kiss' in self.pattern:
-            return 'shared kiss'
-        elif 'embrace' in self.pattern:
-            return 'embraced warmly'
-        elif 'dance' in self.pattern:
-            return 'danced together'
-        elif 'whisper' in self.pattern:
-            return 'whispered softly'
-        elif 'affection' in self.pattern:
-            return 'showed affection'
-        elif 'romantic' in self.pattern:
-            return 'romantic moment'
-
-        # Combat
-        elif 'critical' in self.pattern or 'devastating' in self.pattern:
-            return 'critical strike'
-        elif 'heroically' in self.pattern or 'bravely' in self.pattern:
-            return 'heroic charge'
-        elif 'dodged' in self.pattern or 'parried' in self.pattern:
-            return 'expert defense'
-        elif 'flanked' in self.pattern or 'outmaneuvered' in self.pattern:
-            return 'tactical maneuver'
-        elif 'coordinated' in self.pattern or 'synchronized' in self.pattern:
-            return 'coordinated attack'
-        elif 'last' in self.pattern and 'stand' in self.pattern:
-            return 'last stand'
-
-        # Social bonds
-        elif 'bond' in self.pattern:
-            return 'deepened bond'
-        elif 'trust' in self.pattern:
-            return 'built trust'
-        elif 'together' in self.pattern:
-            return 'worked together'
-        elif 'camaraderie' in self.pattern:
-            return 'shared camaraderie'
-        elif 'laugh' in self.pattern or 'joke' in self.pattern:
-            return 'shared laughter'
-        elif 'celebrated' in self.pattern or 'rejoiced' in self.pattern:
-            return 'celebrated together'
-        elif 'meal' in self.pattern:
-            return 'shared meal'
-
-        # Loyalty
-        elif 'oath' in self.pattern or 'pledged' in self.pattern:
-            return 'pledged oath'
-        elif 'loyalty' in self.pattern:
-            return 'proved loyalty'
-        elif 'refused' in self.pattern and 'abandon' in self.pattern:
-            return 'refused to abandon'
-        elif 'stood' in self.pattern and 'by' in self.pattern:
-            return 'stood by ally'
-
-        # Strategic
-        elif 'plan' in self.pattern or 'strategy' in self.pattern:
-            return 'devised strategy'
-        elif 'outsmarted' in self.pattern or 'outwitted' in self.pattern:
-            return 'outsmarted enemy'
-        elif 'trap' in self.pattern or 'ambush' in self.pattern:
-            return 'detected danger'
-        elif 'puzzle' in self.pattern or 'riddle' in self.pattern:
-            return 'solved puzzle'
-
-        # Vulnerability
-        elif 'revealed' in self.pattern and 'secret' in self.pattern:
-            return 'shared secret'
-        elif 'admitted' in self.pattern or 'confessed' in self.pattern:
-            return 'admitted vulnerability'
-        elif 'cried' in self.pattern or 'wept' in self.pattern:
-            return 'shared tears'
-        elif 'vulnerability' in self.pattern:
-            return 'showed vulnerability'
-
-        # Protection
-        elif 'watch' in self.pattern or 'keen' in self.pattern:
-            return 'kept watch'
-        elif 'protected' in self.pattern:
-            return 'provided protection'
-        elif 'risked' in self.pattern or 'sacrificed' in self.pattern:
-            return 'made sacrifice'
-        elif 'saved' in self.pattern or 'rescued' in self.pattern:
-            return 'performed rescue'
-
-        # Teaching
-        elif 'taught' in self.pattern or 'instructed' in self.pattern:
-            return 'taught skills'
-        elif 'mentored' in self.pattern or 'guided' in self.pattern:
-            return 'mentored ally'
-        elif 'wisdom' in self.pattern or 'knowledge' in self.pattern:
-            return 'shared wisdom'
-
-        # Competition
-        elif 'competition' in self.pattern or 'rivalry' in self.pattern:
-            return 'friendly rivalry'
-        elif 'challenged' in self.pattern or 'competed' in self.pattern:
-            return 'friendly challenge'
-
-        # Negative actions
-        elif 'fled' in self.pattern or 'abandoned' in self.pattern:
-            return 'abandoned in danger'
-        elif 'betrayed' in self.pattern:
-            return 'betrayed trust'
-        elif 'threatened' in self.pattern:
-            return 'made threats'
-        elif 'cruel' in self.pattern or 'callous' in self.pattern:
-            return 'showed cruelty'
-        elif 'lied' in self.pattern or 'deceived' in self.pattern:
-            return 'deceived ally'
-
-        # Resource sharing
-        elif 'generous' in self.pattern:
-            return 'showed generosity'
-
-        else:
-            # Fallback - extract main word from pattern
-            words = re.findall(r'\w+', self.pattern)
-            if words:
-                return ' '.join(words[-2:]) if len(words) > 1 else words[-1]
-            return 'interacted'
+        label = PATTERN_LABELS.get(self.pattern)
+        if label is None:
+            label = _readable_label(self.pattern)
+        return label
 
 class ActionParser:
     """Parses journal entries to extract emotionally significant actions"""
@@ -326,53 +405,132 @@ class ActionParser:
     def __init__(self):
         self.positive_patterns = ACTION_PATTERNS
         self.negative_patterns = NEGATIVE_PATTERNS
+        self.positive_rules = POSITIVE_RULES
+        self.negative_rules = NEGATIVE_RULES
         # NPCs should be provided dynamically from party tracker
         self.companion_npcs = []
+        # Compiled word-boundary regex per NPC name
+        self._npc_regexes = {}
+        # Combined mention scanner per NPC name list (None when the names can't share one)
+        self._mention_scanners = {}
+    
+    def _npc_regex(self, npc_name: str) -> re.Pattern:
+        """Return the cached case-insensitive mention regex for an NPC"""
+        regex = self._npc_regexes.get(npc_name)
+        if regex is None:
+            regex = re.compile(rf'\b{npc_name}\b', re.IGNORECASE)
+            self._npc_regexes[npc_name] = regex
+        return regex
     
     def parse_entry(self, text: str, npc_name: str) -> List[ParsedAction]:
         """Extract actions related to a specific NPC from journal text"""
-        actions = []
-        
         # Check if NPC is mentioned
         if not self._is_npc_mentioned(text, npc_name):
-            return actions
+            return []
+        
+        return self._parse_mentioned(text, npc_name, self._rules_in_text(text))
+    
+    def _rules_in_text(self, text: str) -> Tuple[str, List, List]:
+        """Scan the entry once for which positive/negative rules occur anywhere in it
+
+        Returns the lowered text along with the positive and negative rules found.
+        """
+        text_lower = text.lower()
+        return (
+            text_lower,
+            [rule for rule in self.positive_rules
+             if (rule[3] is None or rule[3] in text_lower) and rule[1].search(text_lower)],
+            [rule for rule in self.negative_rules
+             if (rule[3] is None or rule[3] in text_lower) and rule[1].search(text_lower)]
+        )
+    
+    def _parse_mentioned(self, text: str, npc_name: str, rules_in_text: Tuple[str, List, List]) -> List[ParsedAction]:
+        """Match the rules present in the entry against one NPC's mentions"""
+        actions = []
+        text_lower, positive_rules, negative_rules = rules_in_text
+        
+        # Find all mentions of the NPC and the window (within 150 chars) around
+        # each, as (mention, lowered haystack, start, end). Lowering ASCII text
+        # keeps every offset, so those windows are searched in place in the
+        # lowered entry; otherwise each window is sliced and lowered once.
+        in_place = text.isascii()
+        mention_windows = []
+        for mention in self._npc_regex(npc_name).finditer(text):
+            start = max(0, mention.start() - 150)
+            end = min(len(text), mention.end() + 150)
+            if in_place:
+                mention_windows.append((mention, text_lower, start, end))
+            else:
+                context = text[start:end].lower()
+                mention_windows.append((mention, context, 0, len(context)))
         
         # Look for positive patterns
         actions.extend(self._find_patterns(
-            text, npc_name, self.positive_patterns, 'positive'
+            text, npc_name, mention_windows, positive_rules, 'positive'
         ))
         
         # Look for negative patterns
         actions.extend(self._find_patterns(
-            text, npc_name, self.negative_patterns, 'negative'
+            text, npc_name, mention_windows, negative_rules, 'negative'
         ))
         
         return actions
     
+    def _mention_scanner(self, npc_names: Tuple[str, ...]) -> Optional[re.Pattern]:
+        """Return one regex reporting every name mentioned, via its capture group
+
+        The lookahead tries each text position, and each name gets its own group.
+        The scanner is exact only when at most one name can match at any position,
+        i.e. the names are plain literals and none is a prefix of another.
+        """
+        if npc_names in self._mention_scanners:
+            return self._mention_scanners[npc_names]
+
+        scanner = None
+        lowered = [name.lower() for name in npc_names]
+        if (all(name.isascii() and _LITERAL_NAME_RE.fullmatch(name) for name in npc_names)
+                and not any(a != b and b.startswith(a) for a in lowered for b in lowered)
+                and len(set(lowered)) == len(lowered)):
+            alternatives = '|'.join(f'({name})' for name in npc_names)
+            scanner = re.compile(rf'(?=\b(?:{alternatives})\b)', re.IGNORECASE)
+
+        if len(self._mention_scanners) >= 64:
+            self._mention_scanners.clear()
+        self._mention_scanners[npc_names] = scanner
+        return scanner
+    
+    def _mentioned_npcs(self, text: str, npc_names: List[str]) -> List[str]:
+        """Return the NPCs (in the given order) mentioned in the text"""
+        unique_names = tuple(dict.fromkeys(npc_names))
+        scanner = self._mention_scanner(unique_names) if len(unique_names) > 1 else None
+        if scanner is None:
+            return [npc_name for npc_name in npc_names if self._is_npc_mentioned(text, npc_name)]
+
+        found = set()
+        for match in scanner.finditer(text):
+            found.add(unique_names[match.lastindex - 1])
+            if len(found) == len(unique_names):
+                break
+        return [npc_name for npc_name in npc_names if npc_name in found]
+    
     def _is_npc_mentioned(self, text: str, npc_name: str) -> bool:
         """Check if NPC is mentioned in text"""
-        return bool(re.search(rf'\b{npc_name}\b', text, re.IGNORECASE))
+        return bool(self._npc_regex(npc_name).search(text))
     
-    def _find_patterns(self, text: str, npc_name: str, 
-                      patterns: Dict, action_type: str) -> List[ParsedAction]:
-        """Find action patterns near NPC mentions"""
+    def _find_patterns(self, text: str, npc_name: str, mention_windows: List,
+                      rules: List, action_type: str) -> List[ParsedAction]:
+        """Find action patterns near NPC mentions (rules are already known to occur in text)"""
         found_actions = []
         
-        # Find all mentions of the NPC
-        npc_mentions = list(re.finditer(rf'\b{npc_name}\b', text, re.IGNORECASE))
-        
-        for pattern, emotion_impact in patterns.items():
-            # Check if pattern exists anywhere in text first
-            if not re.search(pattern, text.lower()):
-                continue
-                
-            # Check proximity to NPC mentions (within 150 chars)
-            for mention in npc_mentions:
-                start = max(0, mention.start() - 150)
-                end = min(len(text), mention.end() + 150)
-                context = text[start:end]
-                
-                if re.search(pattern, context.lower()):
+        for pattern, compiled, emotion_impact, anchor in rules:
+            # Check proximity to NPC mentions. Searching between start/end is the
+            # same as searching the sliced window, since no action pattern uses
+            # anchors, word boundaries or lookarounds; a window without the
+            # rule's required literal can't match at all.
+            for mention, haystack, start, end in mention_windows:
+                if anchor is not None and haystack.find(anchor, start, end) < 0:
+                    continue
+                if compiled.search(haystack, start, end):
                     # Extract cleaner context
                     context_start = max(0, mention.start() - 50)
                     context_end = min(len(text), mention.end() + 50) 
@@ -401,8 +559,12 @@ class ActionParser:
 
         npcs_to_check = npc_names if npc_names else self.companion_npcs
 
-        for npc_name in npcs_to_check:
-            actions = self.parse_entry(text, npc_name)
+        # Which rules occur in the entry doesn't depend on the NPC - scan once
+        rules_in_text = None
+        for npc_name in self._mentioned_npcs(text, npcs_to_check):
+            if rules_in_text is None:
+                rules_in_text = self._rules_in_text(text)
+            actions = self._parse_mentioned(text, npc_name, rules_in_text)
             if actions:
                 results[npc_name] = actions
 
@@ -410,11 +572,22 @@ class ActionParser:
     
     def get_emotional_summary(self, actions: List[ParsedAction]) -> Dict[str, float]:
         """Summarize emotional impact of multiple actions"""
-        summary = {'trust': 0.0, 'power': 0.0, 'intimacy': 0.0, 
-                  'fear': 0.0, 'respect': 0.0}
+        trust = power = intimacy = fear = respect = 0.0
         
         for action in actions:
-            for emotion, value in action.emotional_impact.items():
-                summary[emotion] += value
+            impact = IMPACT_VECTORS.get(id(action.emotional_impact))
+            if impact is None:
+                impact = _impact_vector(action.emotional_impact)
+            trust += impact[0]
+            power += impact[1]
+            intimacy += impact[2]
+            fear += impact[3]
+            respect += impact[4]
         
-        return summary
\ No newline at end of file
+        return {'trust': trust, 'power': power, 'intimacy': intimacy,
+                'fear': fear, 'respect': respect}
+
+# Shared parser: the compiled rules never change and the per-NPC regex and
+# mention scanner caches carry over between entries, so callers should use
+# this rather than building their own
+DEFAULT_PARSER = ActionParser()
\ No newline at end of file
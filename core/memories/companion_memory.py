@@ -6,17 +6,52 @@ Manages memory creation, retrieval, and persistence for companion NPCs.
 
 import json
 import os
+import re
 from typing import Dict, List, Optional, Any
 from pathlib import Path
 from collections import defaultdict
+from functools import lru_cache
 
 from .emotional_vectors import EmotionalVector, BEHAVIORAL_EIGENVECTORS
-from .action_parser import ActionParser
+from .action_parser import DEFAULT_PARSER
 from .memory_crystallizer import MemoryCrystallizer, CoreMemory
 from .memory_gravity import GravitationalRetrieval
 from utils.encoding_utils import safe_json_load, safe_json_dump
 from utils.enhanced_logger import debug, info, warning, error
 
+# Behavioral dimension -> (positive words, increase, negative words, decrease).
+# Words match as substrings of the readable action, so each list is one alternation.
+_BEHAVIOR_RULES = (
+    ('protector_vs_exploiter',
+     re.compile('protect|defend|heal|rescue'), 0.1,
+     re.compile('abandon|betray|exploit'), -0.2),
+    ('consistent_vs_chaotic',
+     re.compile('trust|promise|reliable'), 0.1,
+     re.compile('betray|unpredictable'), -0.2),
+    ('generous_vs_greedy',
+     re.compile('share|give|generous'), 0.1,
+     re.compile('steal|hoard|greedy'), -0.2),
+    # Don't trigger on "deceived ally", which means someone else deceived the NPC
+    ('truthful_vs_deceptive',
+     re.compile('honest|truth|confide|admitted|shared secret'), 0.1,
+     re.compile('lied|betrayed trust'), -0.2),
+    # Combat actions (combat, attack, fight) are neutral, not violent
+    ('violent_vs_peaceful',
+     re.compile('peaceful|calm|gentle|comfort|reassurance'), 0.1,
+     re.compile('violent|aggressive|cruel|brutal'), -0.2),
+)
+
+@lru_cache(maxsize=256)
+def _behavior_deltas(action_text: str) -> tuple:
+    """Behavioral model changes for one readable action (a small, fixed set of labels)"""
+    deltas = []
+    for key, positive, increase, negative, decrease in _BEHAVIOR_RULES:
+        if positive.search(action_text):
+            deltas.append((key, increase))
+        elif negative.search(action_text):
+            deltas.append((key, decrease))
+    return tuple(deltas)
+
 class CompanionMemoryManager:
     """Manages the complete memory system for companion NPCs"""
     
@@ -31,7 +66,7 @@ class CompanionMemoryManager:
         self.data_dir.mkdir(parents=True, exist_ok=True)
 
         # Core components
-        self.action_parser = ActionParser()
+        self.action_parser = DEFAULT_PARSER
         self.crystallizer = MemoryCrystallizer(crystallization_threshold=0.35)
         self.retrieval_system = GravitationalRetrieval()
 
@@ -41,6 +76,12 @@ class CompanionMemoryManager:
         self.npc_behavioral_models: Dict[str, Dict[str, float]] = defaultdict(self._init_behavioral_model)
         self.interaction_counts: Dict[str, int] = defaultdict(int)
 
+        # Compiled word-boundary regex per NPC name, for excerpts
+        self._npc_regexes: Dict[str, re.Pattern] = {}
+
+        # NPCs whose saved state changed since their file was last written
+        self._dirty_npcs = set()
+
         # Time tracking
         self.day_counter = 0
         self.last_date = None
@@ -129,15 +170,17 @@ class CompanionMemoryManager:
             return {}
 
         memories_created = {}
+        summary_lower = summary.lower()
 
         # Process each NPC
         for npc_name in party_npcs:
             # Skip if NPC not mentioned
-            if npc_name.lower() not in summary.lower():
+            if npc_name.lower() not in summary_lower:
                 continue
 
             # Track interaction
             self.interaction_counts[npc_name] += 1
+            self._dirty_npcs.add(npc_name)
 
             # Parse actions from journal
             actions = self.action_parser.parse_entry(summary, npc_name)
@@ -214,11 +257,17 @@ class CompanionMemoryManager:
 
         debug("CompanionMemory", f"Applied {days_passed} days of decay (rate: {decay_rate:.3f})")
     
+    def _npc_regex(self, npc_name: str) -> re.Pattern:
+        """Return the cached case-insensitive mention regex for an NPC"""
+        regex = self._npc_regexes.get(npc_name)
+        if regex is None:
+            regex = re.compile(rf'\b{npc_name}\b', re.IGNORECASE)
+            self._npc_regexes[npc_name] = regex
+        return regex
+    
     def _extract_excerpt(self, text: str, npc_name: str, context_chars: int = 100) -> str:
         """Extract relevant excerpt mentioning NPC"""
-        import re
-        
-        match = re.search(rf'\b{npc_name}\b', text, re.IGNORECASE)
+        match = self._npc_regex(npc_name).search(text)
         if match:
             start = max(0, match.start() - context_chars)
             end = min(len(text), match.end() + context_chars)
@@ -236,48 +285,12 @@ class CompanionMemoryManager:
     def _update_behavioral_model(self, npc_name: str, actions: List[Any]) -> None:
         """Update behavioral eigenvector model based on actions"""
         model = self.npc_behavioral_models[npc_name]
+        self._dirty_npcs.add(npc_name)
         
         for action in actions:
             # Analyze action for behavioral patterns
-            action_text = action.get_readable_action().lower()
-            
-            # Protector vs Exploiter
-            if any(word in action_text for word in ['protect', 'defend', 'heal', 'rescue']):
-                model['protector_vs_exploiter'] += 0.1
-            elif any(word in action_text for word in ['abandon', 'betray', 'exploit']):
-                model['protector_vs_exploiter'] -= 0.2
-            
-            # Consistent vs Chaotic
-            if any(word in action_text for word in ['trust', 'promise', 'reliable']):
-                model['consistent_vs_chaotic'] += 0.1
-            elif any(word in action_text for word in ['betray', 'unpredictable']):
-                model['consistent_vs_chaotic'] -= 0.2
-            
-            # Generous vs Greedy
-            if any(word in action_text for word in ['share', 'give', 'generous']):
-                model['generous_vs_greedy'] += 0.1
-            elif any(word in action_text for word in ['steal', 'hoard', 'greedy']):
-                model['generous_vs_greedy'] -= 0.2
-            
-            # Truthful vs Deceptive
-            # Note: Check for positive patterns first, then negative
-            if any(word in action_text for word in ['honest', 'truth', 'confide', 'admitted', 'shared secret']):
-                model['truthful_vs_deceptive'] += 0.1
-            elif any(word in action_text for word in ['lied', 'betrayed trust']):
-                # Don't trigger on "deceived ally" which means enemy deceived the ally
-                model['truthful_vs_deceptive'] -= 0.2
-            elif 'deceived ally' in action_text:
-                # This means someone else deceived the NPC - no change
-                pass
-
-            # Violent vs Peaceful
-            if any(word in action_text for word in ['peaceful', 'calm', 'gentle', 'comfort', 'reassurance']):
-                model['violent_vs_peaceful'] += 0.1
-            elif any(word in action_text for word in ['violent', 'aggressive', 'cruel', 'brutal']):
-                model['violent_vs_peaceful'] -= 0.2
-            elif any(word in action_text for word in ['combat', 'attack', 'fight']):
-                # Combat actions are neutral, not violent
-                pass
+            for key, delta in _behavior_deltas(action.get_readable_action().lower()):
+                model[key] += delta
         
         # Clamp values
         for key in model:
@@ -362,10 +375,13 @@ class CompanionMemoryManager:
         return relationships if relationships else ['Neutral']
     
     def save_all_memories(self) -> None:
-        """Save all memories to disk"""
+        """Save all changed memories to disk"""
         
-        for npc_name in self.npc_memories:
+        # Unchanged NPCs already match their files. A changed NPC is written
+        # once it has a memory list (as before) and stays dirty until then.
+        for npc_name in [name for name in self.npc_memories if name in self._dirty_npcs]:
             self.save_npc_memories(npc_name)
+            self._dirty_npcs.discard(npc_name)
         
         # Save configuration
         self.save_configuration()
@@ -473,6 +489,8 @@ class CompanionMemoryManager:
         if npc_name in self.interaction_counts:
             del self.interaction_counts[npc_name]
         
+        self._dirty_npcs.discard(npc_name)
+        
         # Delete file
         filename = self.data_dir / f"{npc_name.lower().replace(' ', '_')}_memories.json"
         if filename.exists():
@@ -488,6 +506,7 @@ class CompanionMemoryManager:
         self.npc_behavioral_models.clear()
         self.interaction_counts.clear()
         self.processed_entries.clear()
+        self._dirty_npcs.clear()
 
         # Reset counters
         self.day_counter = 0
@@ -162,6 +162,9 @@ RESET_COLOR = "\033[0m"
 
 json_file = "modules/conversation_history/conversation_history.json"
 
+# Created on first save and reused so pair counts carry over between turns
+history_compressor = None
+
 needs_conversation_history_update = False
 should_inject_creation_prompt = False  # Global flag for module creation prompt injection
 
@@ -2168,9 +2171,12 @@ def process_ai_response(response, party_tracker_data, location_data, conversatio
 
 
 def save_conversation_history(history):
+    global history_compressor
     try:
         # Check if we should compress before saving
-        compressor = IncrementalLocationCompressor()
+        if history_compressor is None:
+            history_compressor = IncrementalLocationCompressor()
+        compressor = history_compressor
         
         # Check compression conditions (15+ valid pairs at current location)
         if compressor.should_compress(history):
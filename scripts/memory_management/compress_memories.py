@@ -6,8 +6,19 @@ Compresses memory JSON files to minimal token format for AI DM usage
 
 import json
 import os
+import re
+import sys
+from multiprocessing import Pool
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
+
+# Add the project root to Python path for imports when run directly
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from utils.encoding_utils import ORJSON_AVAILABLE, fast_json_loads
+
+if ORJSON_AVAILABLE:
+    import orjson
 
 # Action abbreviation mapping
 ACTION_MAP = {
@@ -52,42 +63,112 @@ ACTION_MAP = {
     "renewed hope": "rh"
 }
 
+# Code -> action name for decompression (later entries win for shared codes)
+ACTION_REVERSE = {code: action for action, code in ACTION_MAP.items()}
+
+# Substring fallbacks for actions missing from ACTION_MAP, highest priority first
+PARTIAL_ACTION_RULES = (
+    ("kiss", "sk"),     # shared kiss
+    ("dance", "sc"),    # shared camaraderie
+    ("embrace", "em"),  # shared embrace
+    ("hug", "em"),      # shared embrace
+)
+_PARTIAL_ACTION_PATTERN = re.compile("|".join(word for word, _ in PARTIAL_ACTION_RULES))
+_PARTIAL_ACTION_PRIORITY = {word: (rank, code) for rank, (word, code) in enumerate(PARTIAL_ACTION_RULES)}
+
+# Context prefix abbreviations, applied in a single regex pass each way
+CONTEXT_ABBREVIATIONS = {
+    "Positive interaction at ": "Pos@",
+    "Negative encounter at ": "Neg@",
+    "Mixed interactions at ": "Mix@"
+}
+_CONTEXT_EXPANSIONS = {short: full for full, short in CONTEXT_ABBREVIATIONS.items()}
+_CONTEXT_COMPRESS_PATTERN = re.compile("|".join(map(re.escape, CONTEXT_ABBREVIATIONS)))
+_CONTEXT_EXPAND_PATTERN = re.compile("|".join(map(re.escape, _CONTEXT_EXPANSIONS)))
+
+# Below this many NPC files, worker start-up costs more than compressing serially
+PARALLEL_MIN_FILES = 32
+
+# Field order of the compressed emotional-state and behavioral-model arrays
+EMOTION_KEYS = ("trust", "power", "intimacy", "fear", "respect")
+BEHAVIOR_KEYS = (
+    "protector_vs_exploiter",
+    "consistent_vs_chaotic",
+    "generous_vs_greedy",
+    "truthful_vs_deceptive",
+    "violent_vs_peaceful"
+)
+
+# Legends for the compressed arrays (static, built once at import).
+# The written file only carries the ones its NPCs need.
+MEMORY_SPEC = {
+    "es": ["trust", "power", "intimacy", "fear", "respect"],
+    "bm": ["protector", "consistent", "generous", "truthful", "peaceful"],
+    "ct": ["CONFIRMATION", "REVERSAL", "COMPLEXITY", None]
+}
+
+def load_json_file(file_path) -> Any:
+    """Load a JSON file, parsing with orjson when available"""
+    with open(file_path, 'rb') as f:
+        return fast_json_loads(f.read())
+
+def dumps_compact(data: Any) -> bytes:
+    """Serialize to minified, ASCII-escaped JSON bytes, using orjson when available"""
+    if ORJSON_AVAILABLE:
+        # orjson always writes raw UTF-8; keep its output only when there is nothing to escape
+        out = orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+        if out.isascii():
+            return out
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=True).encode('ascii')
+
+def write_compressed_memories(compressed: Dict, file_path) -> None:
+    """Write the compressed structure one NPC at a time instead of as one big string"""
+    with open(file_path, 'wb') as f:
+        f.write(b'{')
+        if "spec" in compressed:
+            f.write(b'"spec":' + dumps_compact(compressed["spec"]) + b',')
+        f.write(b'"npcs":[')
+        for i, npc in enumerate(compressed["npcs"]):
+            if i:
+                f.write(b',')
+            f.write(dumps_compact(npc))
+        f.write(b']}')
+
+def round_vector(values: Dict, keys: tuple, ndigits: int) -> List[float]:
+    """Pack a named vector into a rounded array in the order given by keys"""
+    get = values.get
+    return [round(get(k, 0), ndigits) for k in keys]
+
+def lookup_action_code(action_lower: str) -> Optional[str]:
+    """Resolve a lowercased action to its code: exact match first, then one substring scan"""
+    code = ACTION_MAP.get(action_lower)
+    if code is not None:
+        return code
+    hits = _PARTIAL_ACTION_PATTERN.findall(action_lower)
+    if not hits:
+        return None
+    return min(_PARTIAL_ACTION_PRIORITY[hit] for hit in hits)[1]
+
 def compress_memory(memory: Dict) -> Dict:
     """Compress a single memory to minimal format"""
+    journal = memory['journal_excerpt']
     compressed = {
         "i": memory['id'].split('_')[-1],  # Just keep the number part
         "t": memory['timestamp'],
         "l": memory['location'],
         "a": [],  # Compressed actions
-        "e": [  # Emotional vector as array
-            round(memory['emotional_vector'].get('trust', 0), 2),
-            round(memory['emotional_vector'].get('power', 0), 2),
-            round(memory['emotional_vector'].get('intimacy', 0), 2),
-            round(memory['emotional_vector'].get('fear', 0), 2),
-            round(memory['emotional_vector'].get('respect', 0), 2)
-        ],
+        "e": round_vector(memory['emotional_vector'], EMOTION_KEYS, 2),  # Emotional vector as array
         "v": memory['emotional_velocity'],
-        "j": memory['journal_excerpt'][:80] + "..." if len(memory['journal_excerpt']) > 80 else memory['journal_excerpt'],
-        "c": memory['context'].replace("Positive interaction at ", "Pos@").replace("Negative encounter at ", "Neg@").replace("Mixed interactions at ", "Mix@"),
+        "j": journal if len(journal) <= 80 else journal[:80] + "...",
+        "c": _CONTEXT_COMPRESS_PATTERN.sub(lambda m: CONTEXT_ABBREVIATIONS[m.group(0)], memory['context']),
         "m": memory.get('mass', memory['emotional_velocity']),
         "x": memory.get('interaction_number', 0)
     }
 
     # Compress action names
     for action in memory['trigger_actions']:
-        action_lower = action.lower()
-
-        # Try exact match first
-        if action_lower in ACTION_MAP:
-            compressed_action = ACTION_MAP[action_lower]
-        # Try partial matches for common patterns
-        elif "kiss" in action_lower:
-            compressed_action = "sk"  # shared kiss
-        elif "dance" in action_lower:
-            compressed_action = "sc"  # shared camaraderie
-        elif "embrace" in action_lower or "hug" in action_lower:
-            compressed_action = "em"  # shared embrace
-        else:
+        compressed_action = lookup_action_code(action.lower())
+        if compressed_action is None:
             # Unknown action - keep full text with marker
             compressed_action = f"?{action[:10]}"  # Mark unknown with ? prefix
 
@@ -108,85 +189,29 @@ def compress_npc_data(npc_data: Dict) -> Dict:
     compressed = {
         "n": npc_data['npc_name'],
         "ti": npc_data['total_interactions'],
-        "es": [  # Current emotional state as array
-            round(npc_data['current_emotional_state'].get('trust', 0), 2),
-            round(npc_data['current_emotional_state'].get('power', 0), 2),
-            round(npc_data['current_emotional_state'].get('intimacy', 0), 2),
-            round(npc_data['current_emotional_state'].get('fear', 0), 2),
-            round(npc_data['current_emotional_state'].get('respect', 0), 2)
-        ],
-        "bm": [  # Behavioral model as array
-            round(npc_data['behavioral_model'].get('protector_vs_exploiter', 0), 1),
-            round(npc_data['behavioral_model'].get('consistent_vs_chaotic', 0), 1),
-            round(npc_data['behavioral_model'].get('generous_vs_greedy', 0), 1),
-            round(npc_data['behavioral_model'].get('truthful_vs_deceptive', 0), 1),
-            round(npc_data['behavioral_model'].get('violent_vs_peaceful', 0), 1)
-        ],
+        "es": round_vector(npc_data['current_emotional_state'], EMOTION_KEYS, 2),  # Current emotional state as array
+        "bm": round_vector(npc_data['behavioral_model'], BEHAVIOR_KEYS, 1),  # Behavioral model as array
         "mem": [compress_memory(m) for m in npc_data['core_memories']]
     }
 
     return compressed
 
+def compress_npc_file(file_path) -> Dict:
+    """Load and compress one *_memories.json file (module-level so Pool can pickle it)"""
+    return compress_npc_data(load_json_file(file_path))
+
 def create_compressed_file():
     """Create the main compressed memory file"""
     memory_dir = Path("data/companion_memories")
 
-    # Build the specification
-    spec = {
-        "spec": {
-            "es": ["trust", "power", "intimacy", "fear", "respect"],
-            "es_rng": "-1..+1 (float)",
-            "bm": ["protector", "consistent", "generous", "truthful", "peaceful"],
-            "bm_rng": "-1..+1 (float)",
-            "m": "memory salience (0..2+)",
-            "dr": "decay_resistance (0..1, omit=1)",
-            "v": "emotion_velocity magnitude (0..~2)",
-            "x": "interaction index (int)",
-            "ct": ["CONFIRMATION", "REVERSAL", "COMPLEXITY", None],
-            "tone_map": {
-                "trust": "+warm,+cooperative; -guarded",
-                "power": "+assertive/leader; -deferential",
-                "intimacy": "+personal/vulnerable; -distant",
-                "fear": "+cautious/anxious; -bold",
-                "respect": "+formal/honor; -irreverent"
-            },
-            "act": ACTION_MAP
-        },
-        "guide": {
-            "use": "When narrating, bias tone and choices using current es; blend with most recent mem.e and bm.",
-            "rules": [
-                "Tone: map es to style via spec.tone_map; stronger |es| = stronger tone.",
-                "Actions: treat mem.a codes (spec.act) as hints for verbs/phrases.",
-                "Stability: bm tilts choices (e.g., generous>greedy); do not contradict bm without REVERSAL.",
-                "Momentum: higher v => more emotional intensity in wording/pacing.",
-                "Salience: higher m => memory should be referenced/echoed in narration.",
-                "Decay: low dr fades quickly; prefer recent/high-m items.",
-                "Cascade: ct tags signal beats (CONFIRMATION=reinforce trait, REVERSAL=flip, COMPLEXITY=mixed)."
-            ]
-        }
-    }
-
-    # Load memory config
-    config_path = memory_dir / "memory_config.json"
-    if config_path.exists():
-        with open(config_path, 'r') as f:
-            config = json.load(f)
-            spec["cfg"] = {
-                "c": config.get("crystallization_threshold", 0.35),
-                "m": config.get("max_memories_per_npc", 5),
-                "r": config.get("retrieval_pull_threshold", 0.1),
-                "T": config.get("total_memories_created", 0),
-                "ic": config.get("npc_interaction_counts", {})
-            }
-
     # Process each NPC's memories
-    npcs = []
-    for file_path in memory_dir.glob("*_memories.json"):
-        if file_path.stem != "memory_config":
-            with open(file_path, 'r') as f:
-                npc_data = json.load(f)
-                compressed_npc = compress_npc_data(npc_data)
-                npcs.append(compressed_npc)
+    npc_files = [str(f) for f in memory_dir.glob("*_memories.json") if f.stem != "memory_config"]
+    if len(npc_files) >= PARALLEL_MIN_FILES:
+        # Files are independent; imap keeps the output order deterministic
+        with Pool(processes=min(8, os.cpu_count() or 1)) as pool:
+            npcs = list(pool.imap(compress_npc_file, npc_files))
+    else:
+        npcs = [compress_npc_file(f) for f in npc_files]
 
     # Determine what legend/spec elements are actually needed
     used_actions = set()
@@ -224,13 +249,13 @@ def create_compressed_file():
     total_memories = sum(len(npc.get('mem', [])) for npc in npcs)
 
     if total_memories > 5:  # Include basic legend for larger datasets
-        minimal_spec["es"] = ["trust", "power", "intimacy", "fear", "respect"]
+        minimal_spec["es"] = MEMORY_SPEC["es"]
 
     if total_memories > 10:  # Include behavioral model for very large datasets
-        minimal_spec["bm"] = ["protector", "consistent", "generous", "truthful", "peaceful"]
+        minimal_spec["bm"] = MEMORY_SPEC["bm"]
 
     if has_cascade_types:
-        minimal_spec["ct"] = ["CONFIRMATION", "REVERSAL", "COMPLEXITY", None]
+        minimal_spec["ct"] = MEMORY_SPEC["ct"]
 
     # Build final compressed structure based on size
     original_size = sum(os.path.getsize(f) for f in memory_dir.glob("*_memories.json") if f.stem != "memories_compressed")
@@ -245,8 +270,7 @@ def create_compressed_file():
 
     # Save compressed version
     output_path = memory_dir / "memories_compressed.json"
-    with open(output_path, 'w') as f:
-        json.dump(compressed, f, separators=(',', ':'), ensure_ascii=True)
+    write_compressed_memories(compressed, output_path)
 
     # Recalculate after saving
     compressed_size = os.path.getsize(output_path)
@@ -262,30 +286,18 @@ def create_compressed_file():
 
 def decompress_memories(compressed_path: str = "data/companion_memories/memories_compressed.json"):
     """Decompress memories back to original format (for verification)"""
-    with open(compressed_path, 'r') as f:
-        compressed = json.load(f)
+    compressed = load_json_file(compressed_path)
 
-    # Reverse action map
-    action_reverse = {v: k for k, v in compressed['spec']['act'].items()}
+    # Reverse action map (the spec's act table is a subset of ACTION_MAP, and
+    # is omitted entirely for tiny datasets)
+    action_reverse = ACTION_REVERSE
 
     for npc in compressed['npcs']:
         decompressed = {
             "npc_name": npc['n'],
             "core_memories": [],
-            "current_emotional_state": {
-                "trust": npc['es'][0],
-                "power": npc['es'][1],
-                "intimacy": npc['es'][2],
-                "fear": npc['es'][3],
-                "respect": npc['es'][4]
-            },
-            "behavioral_model": {
-                "protector_vs_exploiter": npc['bm'][0],
-                "consistent_vs_chaotic": npc['bm'][1],
-                "generous_vs_greedy": npc['bm'][2],
-                "truthful_vs_deceptive": npc['bm'][3],
-                "violent_vs_peaceful": npc['bm'][4]
-            },
+            "current_emotional_state": dict(zip(EMOTION_KEYS, npc['es'])),
+            "behavioral_model": dict(zip(BEHAVIOR_KEYS, npc['bm'])),
             "total_interactions": npc['ti']
         }
 
@@ -297,16 +309,10 @@ def decompress_memories(compressed_path: str = "data/companion_memories/memories
                 "location": mem['l'],
                 "npc_name": npc['n'],
                 "trigger_actions": [action_reverse.get(a, a) for a in mem['a']],
-                "emotional_vector": {
-                    "trust": mem['e'][0],
-                    "power": mem['e'][1],
-                    "intimacy": mem['e'][2],
-                    "fear": mem['e'][3],
-                    "respect": mem['e'][4]
-                },
+                "emotional_vector": dict(zip(EMOTION_KEYS, mem['e'])),
                 "emotional_velocity": mem['v'],
                 "journal_excerpt": mem['j'],
-                "context": mem['c'].replace("Pos@", "Positive interaction at ").replace("Neg@", "Negative encounter at ").replace("Mix@", "Mixed interactions at "),
+                "context": _CONTEXT_EXPAND_PATTERN.sub(lambda m: _CONTEXT_EXPANSIONS[m.group(0)], mem['c']),
                 "mass": mem['m'],
                 "decay_resistance": mem.get('dr', 1.0),
                 "cascade_type": mem.get('ct', None),
@@ -324,5 +330,5 @@ if __name__ == "__main__":
 
     # Show sample of compressed output
     print("\nSample compressed NPC (first 500 chars):")
-    sample = json.dumps(compressed_data['npcs'][0] if compressed_data.get('npcs') else {}, separators=(',', ':'))
+    sample = dumps_compact(compressed_data['npcs'][0] if compressed_data.get('npcs') else {}).decode('utf-8')
     print(sample[:500] + "..." if len(sample) > 500 else sample)
\ No newline at end of file
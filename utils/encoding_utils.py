@@ -30,8 +30,32 @@ Provides consistent text sanitization and encoding/decoding functions.
 import unicodedata
 import json
 import codecs
+import math
 from typing import Any, Dict, Optional
 
+# orjson is optional - it parses JSON several times faster than the stdlib.
+# The parser is bound once here so safe_json_load pays no per-call lookup.
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+    _fast_json_loads = orjson.loads
+    # OPT_INDENT_2 gives json.dump(indent=2, ensure_ascii=False)'s layout. Values
+    # come back identical, though floats in exponent form are spelled differently
+    # (1e-7 rather than 1e-07). Passthrough makes datetimes and dataclasses raise
+    # like json.dump does instead of being encoded.
+    _FAST_DUMP_OPTIONS = (orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS |
+                          orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS)
+except ImportError:
+    ORJSON_AVAILABLE = False
+    _fast_json_loads = None
+
+# safe_json_dump formatting; only this exact layout takes the orjson path
+DEFAULT_DUMP_KWARGS = {
+    'ensure_ascii': False,
+    'indent': 2,
+    'separators': (',', ': ')
+}
+
 
 # Comprehensive character mapping for problematic Unicode characters
 CHARACTER_REPLACEMENTS = {
@@ -127,28 +151,85 @@ def sanitize_dict(data: Dict[str, Any]) -> Dict[str, Any]:
         return data
 
 
+def _parse_json_bytes(raw: bytes) -> Any:
+    """
+    Parse raw JSON bytes, handing them straight to orjson when it is installed.
+    Inputs orjson rejects (invalid UTF-8, NaN literals) go through the stdlib parser.
+    """
+    if _fast_json_loads is not None:
+        try:
+            return _fast_json_loads(raw)
+        except ValueError:
+            pass
+    try:
+        text = raw.decode('utf-8')
+    except UnicodeDecodeError:
+        # Try with different encoding if UTF-8 fails
+        text = raw.decode('utf-8', errors='replace')
+    return json.loads(text)
+
+
+def fast_json_loads(text: str) -> Any:
+    """
+    Parse a JSON str or bytes with orjson when it is installed.
+    Raises the stdlib error for invalid input, like json.loads.
+    """
+    if _fast_json_loads is not None:
+        try:
+            return _fast_json_loads(text)
+        except ValueError:
+            pass
+    return json.loads(text)
+
+
 def safe_json_load(filepath: str) -> Any:
     """
     Load JSON file with proper encoding and error handling.
     Returns None if file doesn't exist.
     """
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            # Sanitize the loaded data
-            return sanitize_dict(data)
+        with open(filepath, 'rb') as f:
+            raw = f.read()
+        # Sanitize the loaded data
+        return sanitize_dict(_parse_json_bytes(raw))
     except FileNotFoundError:
         return None
-    except UnicodeDecodeError:
-        # Try with different encoding if UTF-8 fails
-        with open(filepath, 'r', encoding='utf-8', errors='replace') as f:
-            data = json.load(f)
-            return sanitize_dict(data)
     except Exception as e:
         print(f"Error loading JSON from {filepath}: {e}")
         raise
 
 
+# Scalar types (besides float) that orjson and json.dump encode identically,
+# as values or as dict keys
+_PLAIN_JSON_TYPES = frozenset((str, int, bool, type(None)))
+
+
+def _orjson_compatible(data: Any) -> bool:
+    """
+    Check that orjson would write the same data as json.dump: only plain dicts,
+    lists, tuples, strings, ints, bools, None and finite floats. orjson writes
+    NaN/Infinity as null and encodes UUID and Enum values that json.dump
+    rejects; float dict keys are spelled differently (1e+16 vs 1e16).
+    """
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        value_type = type(value)
+        if value_type is dict:
+            for key in value:
+                if type(key) not in _PLAIN_JSON_TYPES:
+                    return False
+            stack.extend(value.values())
+        elif value_type is list or value_type is tuple:
+            stack.extend(value)
+        elif value_type is float:
+            if not math.isfinite(value):
+                return False
+        elif value_type not in _PLAIN_JSON_TYPES:
+            return False
+    return True
+
+
 def safe_json_dump(data: Any, filepath: str, **kwargs) -> None:
     """
     Save JSON file with proper encoding and sanitization.
@@ -157,13 +238,20 @@ def safe_json_dump(data: Any, filepath: str, **kwargs) -> None:
     clean_data = sanitize_dict(data) if isinstance(data, (dict, list)) else data
     
     # Default kwargs for consistent JSON formatting
-    default_kwargs = {
-        'ensure_ascii': False,
-        'indent': 2,
-        'separators': (',', ': ')
-    }
+    default_kwargs = dict(DEFAULT_DUMP_KWARGS)
     default_kwargs.update(kwargs)
     
+    if ORJSON_AVAILABLE and default_kwargs == DEFAULT_DUMP_KWARGS and _orjson_compatible(clean_data):
+        try:
+            payload = orjson.dumps(clean_data, option=_FAST_DUMP_OPTIONS)
+        except TypeError:
+            # Unsupported types (e.g. ints beyond 64 bits) - use the stdlib encoder
+            payload = None
+        if payload is not None:
+            with open(filepath, 'wb') as f:
+                f.write(payload)
+            return
+    
     with open(filepath, 'w', encoding='utf-8') as f:
         json.dump(clean_data, f, **default_kwargs)
 